@@ -3,48 +3,167 @@ import fitz  # PyMuPDF
 import json
 import ollama
 import re
+import os
+import time
+import shelve
+import hashlib
 
 st.set_page_config(page_title="CV Parser with Job Match", page_icon="🧠", layout="wide")
 st.title("CV Parser + Job Relevance Scorer (Local LLM with Ollama)")
 
 st.markdown("Upload a PDF CV → Extract structured info → Enter target job → Get relevance score & recommendations.")
 
+# Patterns are compiled once at import instead of on every call.
+_WS = re.compile(r'\s+')
+_TRAIL_COMMA = re.compile(r',\s*([\]}])')
+
+# On-disk cache of parsed LLM replies, keyed by model + prompt.
+MODEL = "mistral"
+CACHE_PATH = os.path.expanduser("~/.cv_parser_cache")
+CACHE_TTL = 30 * 24 * 3600  # seconds
+
+# JSON schemas passed to Ollama's structured outputs (`format=`), so the model
+# is constrained to valid JSON of the expected shape.
+_STR_LIST = {"type": "array", "items": {"type": "string"}}
+CV_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "contact": {"type": "string"},
+        "summary": {"type": "string"},
+        "education": _STR_LIST,
+        "experience": _STR_LIST,
+        "projects": _STR_LIST,
+        "skills": _STR_LIST,
+        "certifications": _STR_LIST,
+    },
+    "required": ["name", "contact", "summary", "education", "experience",
+                 "projects", "skills", "certifications"],
+}
+RELEVANCE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "relevance_score": {"type": "integer", "minimum": 0, "maximum": 100},
+        "fit_level": {"type": "string", "enum": ["Strong Fit", "Moderate Fit",
+                                                 "Needs Improvement", "Weak Fit"]},
+        "missing_skills": _STR_LIST,
+        "strengths": _STR_LIST,
+        "weaknesses": _STR_LIST,
+        "recommendation": {"type": "string"},
+    },
+    "required": ["relevance_score", "fit_level", "missing_skills", "strengths",
+                 "weaknesses", "recommendation"],
+}
+
 # -----------------------------
 # PDF TEXT EXTRACTION
 # -----------------------------
 def extract_text_from_pdf(pdf_file):
-    text = ""
+    parts = []
     with fitz.open(stream=pdf_file.read(), filetype="pdf") as doc:
         for page in doc:
-            text += page.get_text("text") + "\n"
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+            # text blocks only (block type 0); image blocks are skipped
+            parts.extend(b[4] for b in page.get_text("blocks") if b[6] == 0)
+    text = "\n".join(parts)
+    return _WS.sub(' ', text).strip()
 
 # -----------------------------
 # JSON EXTRACTION HELPERS
 # -----------------------------
+def _first_json_object(text):
+    """Return the first balanced top-level {...} in text, or None (linear scan)."""
+    start = text.find('{')
+    if start < 0:
+        return None
+    depth = 0
+    in_str = esc = False
+    for j in range(start, len(text)):
+        c = text[j]
+        if in_str:
+            if esc:
+                esc = False
+            elif c == '\\':
+                esc = True
+            elif c == '"':
+                in_str = False
+        elif c == '"':
+            in_str = True
+        elif c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:j + 1]
+    return None
+
 def extract_json_from_text(text):
-    json_match = re.search(r'\{.*\}', text, re.DOTALL)
-    if json_match:
-        json_str = json_match.group(0)
+    json_str = _first_json_object(text)
+    if json_str:
         try:
             return json.loads(json_str)
         except:
             try:
-                json_str = re.sub(r',\s*([\]}])', r'\1', json_str)
+                json_str = _TRAIL_COMMA.sub(r'\1', json_str)
                 return json.loads(json_str)
             except:
                 return {}
     return {}
 
+# -----------------------------
+# OLLAMA CALL WITH DISK CACHE
+# -----------------------------
+def ask_ollama_json(prompt, schema=None, model=MODEL):
+    tag = json.dumps(schema, sort_keys=True) if schema else ""
+    key = hashlib.blake2b(f"{model}|{tag}|{prompt}".encode("utf-8")).hexdigest()
+    try:
+        with shelve.open(CACHE_PATH) as cache:
+            hit = cache.get(key)
+        if hit and time.time() - hit[0] < CACHE_TTL:
+            return hit[1]
+    except Exception:
+        hit = None
+
+    # Plain generate (no chat template), streamed so we can stop as soon as
+    # the JSON object is complete instead of waiting for trailing tokens.
+    stream = ollama.generate(
+        model=model,
+        prompt=prompt,
+        format=schema or "json",
+        stream=True,
+        options={"num_predict": 2048, "temperature": 0.1},
+    )
+    pieces = []
+    parsed = None
+    for chunk in stream:
+        piece = chunk["response"]
+        pieces.append(piece)
+        if "}" in piece:
+            try:
+                parsed = json.loads("".join(pieces))
+                break
+            except ValueError:
+                pass
+    if hasattr(stream, "close"):
+        stream.close()
+    if parsed is None:
+        parsed = extract_json_from_text("".join(pieces))  # older servers ignore schemas
+    if parsed:  # don't pin failed parses
+        try:
+            with shelve.open(CACHE_PATH) as cache:
+                cache[key] = (time.time(), parsed)
+        except Exception:
+            pass
+    return parsed
+
 # -----------------------------
 # OLLAMA: CV STRUCTURE PARSER
 # -----------------------------
-def analyze_cv_with_ollama(cv_text):
-    prompt = f"""
+# Static prompt text is built once; only the CV/job text is spliced in, so every
+# request shares a byte-identical prefix that Ollama can reuse from its cache.
+_CV_PROMPT_HEAD = """
 You are an expert CV parser. 
 Extract and return **only valid JSON** with the following schema:
-{{
+{
   "name": "",
   "contact": "",
   "summary": "",
@@ -53,33 +172,33 @@ Extract and return **only valid JSON** with the following schema:
   "projects": [],
   "skills": [],
   "certifications": []
-}}
+}
 CV Text:
-\"\"\"{cv_text}\"\"\" 
+\"\"\""""
+_CV_PROMPT_TAIL = '''\"\"\" 
 Return only JSON.
-"""
-    response = ollama.chat(model="mistral", messages=[{"role": "user", "content": prompt}])
-    content = response["message"]["content"]
-    parsed_json = extract_json_from_text(content)
-    return parsed_json
+'''
+
+def analyze_cv_with_ollama(cv_text):
+    prompt = "".join((_CV_PROMPT_HEAD, cv_text, _CV_PROMPT_TAIL))
+    return ask_ollama_json(prompt, CV_SCHEMA)
 
 # -----------------------------
 # OLLAMA: JOB MATCH SCORER
 # -----------------------------
-def score_job_relevance(cv_json, job_profile):
-    prompt = f"""
+_SCORE_PROMPT_HEAD = """
 You are an ATS + HR expert. 
 Compare the CV JSON with the target job profile and return ONLY valid JSON.
 
 SCHEMA:
-{{
+{
   "relevance_score": 0-100,
   "fit_level": "", 
   "missing_skills": [],
   "strengths": [],
   "weaknesses": [],
   "recommendation": ""
-}}
+}
 
 Guidelines:
 - Base the score on **skills match**, **experience relevance**, and **project alignment**.
@@ -87,17 +206,20 @@ Guidelines:
 - Recommendation must be a short, actionable paragraph.
 
 CV JSON:
-{json.dumps(cv_json)}
+"""
+_SCORE_PROMPT_MID = """
 
 Target Job Profile:
-\"\"\"{job_profile}\"\"\" 
+\"\"\""""
+_SCORE_PROMPT_TAIL = '''\"\"\" 
 
 Return only JSON.
-"""
+'''
 
-    response = ollama.chat(model="mistral", messages=[{"role": "user", "content": prompt}])
-    content = response["message"]["content"]
-    return extract_json_from_text(content)
+def score_job_relevance(cv_json, job_profile):
+    prompt = "".join((_SCORE_PROMPT_HEAD, json.dumps(cv_json), _SCORE_PROMPT_MID,
+                      job_profile, _SCORE_PROMPT_TAIL))
+    return ask_ollama_json(prompt, RELEVANCE_SCHEMA)
 
 # -----------------------------
 # STREAMLIT UI
@@ -9,23 +9,30 @@ The model:
 - Outputs a score in [0, 1] interpreted as "suitability" of that content
 """
 
-import math
-import random
+from functools import lru_cache
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional
+import importlib.util
 import sys
+from collections import defaultdict
 
-# Optional: for visualization later
-try:
+import numpy as np
+
+# Optional: for visualization later. Only check availability here; the
+# (slow) imports happen in _lazy_viz when a plot is actually requested.
+HAS_VIZ = all(importlib.util.find_spec(m) is not None for m in ("networkx", "matplotlib"))
+if not HAS_VIZ:
+    print("Visualization libs not installed. Run `pip install networkx` if needed.")
+
+
+def _lazy_viz():
+    """Import and return (networkx, matplotlib.pyplot)."""
     import networkx as nx
     import matplotlib.pyplot as plt
-    HAS_VIZ = True
-except ImportError:
-    HAS_VIZ = False
-    print("Visualization libs not installed. Run `pip install networkx` if needed.")
+    return nx, plt
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SkillNode:
     skill_id: str
     name: str
@@ -61,8 +68,31 @@ SKILL_DEFS: Dict[str, SkillNode] = {
     ),
 }
 
-
-@dataclass
+# Static per-skill lookups used when building feature vectors
+_REQ_XP: Dict[str, float] = {sid: float(n.required_xp) for sid, n in SKILL_DEFS.items()}
+_INV_REQ: Dict[str, float] = {
+    sid: 1.0 / n.required_xp if n.required_xp > 0 else 0.0 for sid, n in SKILL_DEFS.items()
+}
+_ROLES_SET: Dict[str, frozenset] = {sid: frozenset(n.roles) for sid, n in SKILL_DEFS.items()}
+
+# Struct-of-arrays view of the skill tree: skills are addressed by position in
+# SIDS, dependencies are stored CSR-style (DEPS_INDPTR / DEPS_INDICES).
+UNLOCK_FRACTION = 0.7
+SIDS: List[str] = list(SKILL_DEFS)
+SKILL_INDEX: Dict[str, int] = {sid: i for i, sid in enumerate(SIDS)}
+REQUIRED_XP = np.array([SKILL_DEFS[sid].required_xp for sid in SIDS], dtype=np.int32)
+UNLOCK_XP = UNLOCK_FRACTION * REQUIRED_XP
+DEPS_INDPTR = np.cumsum([0] + [len(SKILL_DEFS[sid].depends_on) for sid in SIDS]).astype(np.int32)
+DEPS_INDICES = np.array(
+    [SKILL_INDEX[d] for sid in SIDS for d in SKILL_DEFS[sid].depends_on], dtype=np.int32
+)
+
+# Skill status codes; UserSkillState.status carries the matching name
+STATUS_LOCKED, STATUS_UNLOCKED, STATUS_IN_PROGRESS, STATUS_COMPLETED = range(4)
+STATUS_NAMES = np.array(["locked", "unlocked", "in_progress", "completed"])
+
+
+@dataclass(slots=True, frozen=True)
 class ContentItem:
     content_id: str
     title: str
@@ -98,8 +128,14 @@ CONTENT_DB: Dict[str, ContentItem] = {
     ),
 }
 
+# Content pre-filtered by the roles its skill is relevant for
+CONTENT_BY_ROLE: Dict[str, List[ContentItem]] = defaultdict(list)
+for _content in CONTENT_DB.values():
+    for _role in SKILL_DEFS[_content.skill_id].roles:
+        CONTENT_BY_ROLE[_role].append(_content)
 
-@dataclass
+
+@dataclass(slots=True)
 class UserSkillState:
     current_xp: int = 0
     status: str = "locked"  # "locked", "unlocked", "in_progress", "completed"
@@ -138,41 +174,93 @@ def build_user_state_from_cv(cv_features: Dict[str, Dict]) -> Dict[str, UserSkil
     return user_state
 
 
+def initial_xp_matrix(cv_features_list: List[Dict[str, Dict]]) -> np.ndarray:
+    """
+    Vectorised compute_initial_xp_for_skill for a cohort: returns a (U, S)
+    int array of starting XP, columns ordered as SIDS.
+    """
+    shape = (len(cv_features_list), len(SIDS))
+    years = np.zeros(shape)
+    projects = np.zeros(shape)
+    has_cert = np.zeros(shape, dtype=bool)
+    for u, cv_features in enumerate(cv_features_list):
+        for sid, feat in cv_features.items():
+            j = SKILL_INDEX.get(sid)
+            if j is None or not feat:
+                continue
+            years[u, j] = feat.get("years_experience", 0)
+            projects[u, j] = feat.get("num_projects", 0)
+            has_cert[u, j] = bool(feat.get("has_cert", False))
+
+    xp = np.minimum(50, years * 20) + np.minimum(30, projects * 10) + np.where(has_cert, 20, 0)
+    return np.trunc(np.minimum(xp, REQUIRED_XP)).astype(np.int64)
+
+
+def build_user_state_batch(cv_features_list: List[Dict[str, Dict]]) -> List[Dict[str, UserSkillState]]:
+    """Batch version of build_user_state_from_cv for scoring many users at once."""
+    xp = initial_xp_matrix(cv_features_list).tolist()
+    return [
+        {sid: UserSkillState(current_xp=x) for sid, x in zip(SIDS, row)}
+        for row in xp
+    ]
+
+
 def is_unlocked(skill_id: str, user_state: Dict[str, UserSkillState]) -> bool:
-    node = SKILL_DEFS[skill_id]
-    if not node.depends_on:
-        return True
-    for dep_id in node.depends_on:
-        dep_node = SKILL_DEFS[dep_id]
-        dep_state = user_state.get(dep_id, UserSkillState())
-        threshold = 0.7 * dep_node.required_xp
-        if dep_state.current_xp < threshold:
-            return False
-    return True
+    i = SKILL_INDEX[skill_id]
+    # 1-3 deps per skill: a plain loop beats building arrays for them
+    return all(
+        user_state.get(SIDS[d], UserSkillState()).current_xp >= UNLOCK_XP[d]
+        for d in DEPS_INDICES[DEPS_INDPTR[i]:DEPS_INDPTR[i + 1]].tolist()
+    )
+
+
+def status_codes(current_xp: np.ndarray) -> np.ndarray:
+    """
+    int8 status code per skill from XP laid out along the last axis in SIDS
+    order; accepts one user (S,) or a cohort (U, S).
+    """
+    current_xp = np.asarray(current_xp, dtype=np.float64)
+
+    # A skill is unlocked when none of its dependency edges is below threshold;
+    # failures are counted per CSR segment via a cumulative sum.
+    failed = current_xp[..., DEPS_INDICES] < UNLOCK_XP[DEPS_INDICES]
+    failed_cs = np.zeros(failed.shape[:-1] + (failed.shape[-1] + 1,), dtype=np.int32)
+    np.cumsum(failed, axis=-1, out=failed_cs[..., 1:])
+    dep_ok = failed_cs[..., DEPS_INDPTR[1:]] == failed_cs[..., DEPS_INDPTR[:-1]]
+
+    codes = np.where(
+        current_xp >= REQUIRED_XP, STATUS_COMPLETED,
+        np.where(dep_ok, np.where(current_xp > 0, STATUS_IN_PROGRESS, STATUS_UNLOCKED), STATUS_LOCKED),
+    )
+    return codes.astype(np.int8)
+
+
+def cohort_state(cv_features_list: List[Dict[str, Dict]]):
+    """
+    Array form of build_user_state_from_cv + update_statuses for a cohort:
+    (U, S) int32 XP and uint8 status codes, columns ordered as SIDS. No
+    per-user dicts or UserSkillState objects are created.
+    """
+    xp = initial_xp_matrix(cv_features_list).astype(np.int32)
+    return xp, status_codes(xp).astype(np.uint8)
 
 
 def update_statuses(user_state: Dict[str, UserSkillState]) -> None:
-    for sid, node in SKILL_DEFS.items():
-        state = user_state[sid]
-        if state.current_xp >= node.required_xp:
-            state.status = "completed"
-        elif is_unlocked(sid, user_state):
-            state.status = "in_progress" if state.current_xp > 0 else "unlocked"
-        else:
-            state.status = "locked"
+    current_xp = np.fromiter(
+        (user_state[sid].current_xp for sid in SIDS), dtype=np.float64, count=len(SIDS)
+    )
+    statuses = STATUS_NAMES[status_codes(current_xp)]
+    for sid, status in zip(SIDS, statuses.tolist()):
+        user_state[sid].status = status
 
 
 # ---------------------------------------------------------------------------
 # "AI" PART: Tiny Neural Network Model for Ranking Recommendations
 # ---------------------------------------------------------------------------
 
-def sigmoid(x: float) -> float:
-    return 1.0 / (1.0 + math.exp(-x))
-
-
-def tanh(x: float) -> float:
-    return math.tanh(x)
-
+# Single-vector predictions are cached on features rounded to this many decimals
+FEATURE_ROUND_DIGITS = 3
+FEATURE_CACHE_SIZE = 4096
 
 class TinyRecommendationModel:
     """
@@ -188,15 +276,13 @@ class TinyRecommendationModel:
         self.hidden_dim = hidden_dim
 
         # Pretend these were learned from data
-        random.seed(42)  # fixed for reproducibility
+        rng = np.random.default_rng(42)  # fixed for reproducibility
 
         # Initialize weights with small random values
-        self.W1 = [[(random.random() - 0.5) * 0.5 for _ in range(input_dim)]
-                   for _ in range(hidden_dim)]
-        self.b1 = [(random.random() - 0.5) * 0.5 for _ in range(hidden_dim)]
-
-        self.W2 = [(random.random() - 0.5) * 0.5 for _ in range(hidden_dim)]
-        self.b2 = (random.random() - 0.5) * 0.5
+        self.W1 = ((rng.random((hidden_dim, input_dim)) - 0.5) * 0.5).astype(np.float32)
+        self.b1 = ((rng.random(hidden_dim) - 0.5) * 0.5).astype(np.float32)
+        self.W2 = ((rng.random(hidden_dim) - 0.5) * 0.5).astype(np.float32)
+        self.b2 = np.float32((rng.random() - 0.5) * 0.5)
 
         # Manual tweaks to reflect some intuitive behavior:
         # - Favor skills that are unlocked but not yet completed
@@ -205,36 +291,61 @@ class TinyRecommendationModel:
         # For example: increase importance of "xp_gap" (index 1) and "role_match" (index 3)
         # by slightly scaling corresponding W1 columns.
         important_indices = [1, 3]
-        for h in range(hidden_dim):
-            for idx in important_indices:
-                self.W1[h][idx] *= 2.0
+        self.W1[:, important_indices] *= 2.0
 
-    def predict_proba(self, features: List[float]) -> float:
+        # int8 copy of W1 with a per-row scale for the batched path
+        scale = np.abs(self.W1).max(axis=1) / 127.0
+        scale[scale == 0] = 1.0
+        self._W1q = np.round(self.W1 / scale[:, None]).astype(np.int8)
+        self._W1s = scale.astype(np.float32)
+
+        # Features are mostly discrete (status flags, role match, xp bins), so the
+        # same vectors come back again and again; memoise the forward pass on them.
+        self._cached_forward = lru_cache(maxsize=FEATURE_CACHE_SIZE)(self._forward)
+
+    def predict_proba_checked(self, features: List[float]) -> float:
         """
-        Forward pass: returns a score in [0,1].
+        Validating entry point for external callers: checks the feature length,
+        then runs predict_proba.
         """
         if len(features) != self.input_dim:
             raise ValueError(f"Expected {self.input_dim} features, got {len(features)}")
+        return self.predict_proba(features)
 
-        # Hidden layer
-        hidden = []
-        for h in range(self.hidden_dim):
-            z = self.b1[h]
-            for i, x in enumerate(features):
-                z += self.W1[h][i] * x
-            hidden.append(tanh(z))
+    def predict_proba(self, features: List[float]) -> float:
+        """
+        Forward pass: returns a score in [0,1].
+        Assumes `features` has input_dim entries (as build_feature_vector
+        produces); use predict_proba_checked for untrusted input.
+        """
+        key = tuple(round(float(f), FEATURE_ROUND_DIGITS) for f in features)
+        return self._cached_forward(key)
 
-        # Output layer
-        z_out = self.b2
-        for h in range(self.hidden_dim):
-            z_out += self.W2[h] * hidden[h]
+    def _forward(self, features: tuple) -> float:
+        x = np.asarray(features, dtype=np.float32)
+        hidden = np.tanh(self.W1 @ x + self.b1)
+        z_out = self.W2 @ hidden + self.b2
 
         # Sigmoid squashes to [0,1]
-        return sigmoid(z_out)
+        return float(1.0 / (1.0 + np.exp(-z_out)))
+
+    def predict_proba_batch(self, X: np.ndarray) -> np.ndarray:
+        """
+        Batched forward pass over an (N, input_dim) feature matrix.
+        Returns an (N,) array of scores in [0,1].
+        """
+        X = np.asarray(X, dtype=np.float32)
+        # Dequantize after the matmul: (X @ W1q.T) * scale == X @ W1.T (up to rounding)
+        hidden = np.tanh((X @ self._W1q.T) * self._W1s + self.b1)
+        z_out = hidden @ self.W2 + self.b2
+        return 1.0 / (1.0 + np.exp(-z_out))
 
 
 MODEL = TinyRecommendationModel(input_dim=8, hidden_dim=6)
 
+# Exploration jitter is drawn from its own generator, one vector per request
+_JITTER_RNG = np.random.default_rng(42)
+
 
 def build_feature_vector(
     user_state: Dict[str, UserSkillState],
@@ -247,12 +358,11 @@ def build_feature_vector(
     This is what we feed into the TinyRecommendationModel.
     """
 
-    node = SKILL_DEFS[skill_id]
     state = user_state[skill_id]
 
-    required_xp = float(node.required_xp)
-    xp_ratio = state.current_xp / required_xp if required_xp > 0 else 0.0
-    xp_gap = (required_xp - state.current_xp) / required_xp if required_xp > 0 else 1.0
+    inv_required = _INV_REQ[skill_id]
+    xp_ratio = state.current_xp * inv_required
+    xp_gap = (_REQ_XP[skill_id] - state.current_xp) * inv_required if inv_required else 1.0
     xp_gap = max(0.0, min(1.0, xp_gap))
 
     # Encode status as simple scalars (could also do one-hot)
@@ -261,7 +371,7 @@ def build_feature_vector(
     status_completed = 1.0 if state.status == "completed" else 0.0
 
     # Is this skill relevant for the target role?
-    role_match = 1.0 if target_role in node.roles else 0.0
+    role_match = 1.0 if target_role in _ROLES_SET[skill_id] else 0.0
 
     # Content type and difficulty as numeric hints
     is_course = 1.0 if content.type == "course" else 0.0
@@ -283,6 +393,18 @@ def build_feature_vector(
     return features
 
 
+def build_feature_matrix(
+    user_state: Dict[str, UserSkillState],
+    contents: List[ContentItem],
+    target_role: str,
+) -> np.ndarray:
+    """
+    Stack the feature vectors of several content items into an (N, 8) matrix.
+    """
+    rows = [build_feature_vector(user_state, c.skill_id, c, target_role) for c in contents]
+    return np.asarray(rows, dtype=np.float32).reshape(len(rows), MODEL.input_dim)
+
+
 def get_ai_recommendations(
     user_state: Dict[str, UserSkillState],
     target_role: str,
@@ -292,36 +414,33 @@ def get_ai_recommendations(
     Uses the TinyRecommendationModel to score and rank content items for the user.
     """
 
-    scored_items = []
+    candidates: List[ContentItem] = []
 
-    for content in CONTENT_DB.values():
-        skill_id = content.skill_id
-        node = SKILL_DEFS[skill_id]
-        state = user_state[skill_id]
-
-        # Skip skills that are completely irrelevant to the target role
-        if target_role not in node.roles:
-            continue
+    # Only content whose skill is relevant to the target role is considered
+    for content in CONTENT_BY_ROLE.get(target_role, ()):
+        state = user_state[content.skill_id]
 
         # Skip locked or already completed skills for now
         if state.status == "locked" or state.status == "completed":
             continue
 
-        # Build features for this (user, skill, content, role)
-        features = build_feature_vector(user_state, skill_id, content, target_role)
-        score = MODEL.predict_proba(features)
-
-        # Add a tiny random jitter to encourage exploration / tie-breaking
-        score += random.random() * 0.02
+        candidates.append(content)
 
-        scored_items.append((score, content))
+    # Score every candidate in one batched forward pass
+    X = build_feature_matrix(user_state, candidates, target_role)
+    scores = MODEL.predict_proba_batch(X)
 
-    # Sort by descending score
-    scored_items.sort(key=lambda x: x[0], reverse=True)
+    # Add a tiny random jitter to encourage exploration / tie-breaking
+    scores = scores + _JITTER_RNG.random(len(scores)) * 0.02
 
-    # Return top_k items
-    return [item for score, item in scored_items[:top_k]]
+    # Partial top-k selection, then order just those k by descending score
+    k = min(top_k, len(scores))
+    if k <= 0:
+        return []
+    idx = np.argpartition(-scores, k - 1)[:k]
+    idx = idx[np.argsort(-scores[idx], kind="stable")]
 
+    return [candidates[i] for i in idx]
 
 if __name__ == "__main__":
     sys.stdout.reconfigure(encoding="utf-8")
@@ -4,7 +4,7 @@ import pandas as pd
 import matplotlib.pyplot as plt
 
 from typing import Dict, List, Optional, Tuple
-from sklearn.metrics import confusion_matrix, brier_score_loss, roc_curve
+from sklearn.metrics import roc_curve
 from sklearn.linear_model import LogisticRegression
 
 warnings.filterwarnings("ignore")
@@ -72,7 +72,16 @@ y = df[LABEL_COL].astype(int).values
 model = LogisticRegression()
 model.fit(X, y)
 
-df["model_score"] = model.predict_proba(X)[:, 1] * 100.0
+# Score with the fitted coefficients directly (skips sklearn's per-call validation)
+_W, _B = model.coef_.ravel(), model.intercept_[0]
+
+
+def model_scores(X: np.ndarray) -> np.ndarray:
+    """Positive-class probability from the fitted logistic model, on a 0-100 scale."""
+    return 100.0 / (1.0 + np.exp(-(X @ _W + _B)))
+
+
+df["model_score"] = model_scores(X)
 
 SCORE_COL = "model_score"
 
@@ -107,31 +116,36 @@ def group_rates(
 ) -> pd.DataFrame:
     """
     Compute selection rate and confusion-matrix-based rates per group.
+
+    Counts come from one np.bincount over a packed (group, y_true, y_pred)
+    key, so counts[g, t, p] holds tn/fp/fn/tp for every group at once.
     """
-    out = []
-    for g, idx in group.groupby(group).groups.items():
-        yp = y_pred.loc[idx]
-        sel_rate = yp.mean() if len(yp) else np.nan
-        row = {"group": g, "n": len(idx), "selection_rate": sel_rate}
-
-        if y_true is not None and y_true.notna().any():
-            yt = y_true.loc[idx].astype(int)
-            try:
-                tn, fp, fn, tp = confusion_matrix(yt, yp.astype(int), labels=[0, 1]).ravel()
-            except ValueError:
-                # Handle edge cases where confusion_matrix cannot ravel (e.g., only one class)
-                tn = fp = fn = tp = 0
-                if yt.eq(0).all() and yp.eq(0).all():
-                    tn = len(yt)
-                if yt.eq(1).all() and yp.eq(1).all():
-                    tp = len(yt)
-            tpr = tp / (tp + fn) if (tp + fn) > 0 else np.nan
-            fpr = fp / (fp + tn) if (fp + tn) > 0 else np.nan
-            row.update({"tpr": tpr, "fpr": fpr})
-
-        out.append(row)
-
-    return pd.DataFrame(out).sort_values("group").reset_index(drop=True)
+    codes, groups = pd.factorize(group, sort=True)
+    n_groups = len(groups)
+    yp = y_pred.to_numpy().astype(np.int64)
+    keep = codes >= 0  # missing group labels are dropped, as groupby does
+    codes, yp = codes[keep], yp[keep]
+
+    n = np.bincount(codes, minlength=n_groups)
+    selected = np.bincount(codes, weights=yp, minlength=n_groups)
+    out = pd.DataFrame({
+        "group": np.asarray(groups),
+        "n": n,
+        "selection_rate": selected / n,
+    })
+
+    if y_true is not None and y_true.notna().any():
+        yt = y_true.to_numpy().astype(np.int64)[keep]
+        key = codes * 4 + yt * 2 + yp
+        counts = np.bincount(key, minlength=n_groups * 4).reshape(-1, 2, 2)
+        tn, fp = counts[:, 0, 0], counts[:, 0, 1]
+        fn, tp = counts[:, 1, 0], counts[:, 1, 1]
+        pos, neg = tp + fn, fp + tn
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["tpr"] = np.where(pos > 0, tp / pos, np.nan)
+            out["fpr"] = np.where(neg > 0, fp / neg, np.nan)
+
+    return out
 
 
 def disparate_impact(selection_rates: pd.Series, ref_rate: float) -> pd.Series:
@@ -148,17 +162,21 @@ def brier_by_group(
 ) -> pd.DataFrame:
     """
     Compute Brier score per group (calibration measure).
+
+    Brier is the mean squared error between probability and label, so the
+    squared errors are computed once and averaged per group with np.bincount.
     """
-    out = []
-    p = np.clip(scores / 100.0, 1e-6, 1 - 1e-6)
-    for g, idx in group.groupby(group).groups.items():
-        y = labels.loc[idx].astype(int)
-        if len(idx) == 0:
-            b = np.nan
-        else:
-            b = brier_score_loss(y, p.loc[idx])
-        out.append({"group": g, "n": len(idx), "brier": b})
-    return pd.DataFrame(out).sort_values("group").reset_index(drop=True)
+    p = np.clip(scores.to_numpy(dtype=np.float64) / 100.0, 1e-6, 1 - 1e-6)
+    sq = (p - labels.to_numpy().astype(int)) ** 2
+    codes, groups = pd.factorize(group, sort=True)
+    keep = codes >= 0  # missing group labels are dropped, as groupby does
+    codes, sq = codes[keep], sq[keep]
+    n = np.bincount(codes, minlength=len(groups))
+    return pd.DataFrame({
+        "group": np.asarray(groups),
+        "n": n,
+        "brier": np.bincount(codes, weights=sq, minlength=len(groups)) / n,
+    })
 
 
 def fairness_table(df: pd.DataFrame, group_col: str) -> Dict[str, pd.DataFrame]:
@@ -173,13 +191,16 @@ def fairness_table(df: pd.DataFrame, group_col: str) -> Dict[str, pd.DataFrame]:
     rates = group_rates(y_pred, y_true, grp)
 
     # Reference group = group with highest selection rate
-    ref_idx = rates["selection_rate"].idxmax()
-    ref_group = rates.loc[ref_idx, "group"]
-    ref_rate = rates.loc[ref_idx, "selection_rate"]
+    sr = rates["selection_rate"].to_numpy()
+    i = int(np.argmax(sr))
+    ref_group = rates["group"].iat[i]
+    ref_rate = sr[i]
 
-    rates["disparate_impact"] = disparate_impact(rates["selection_rate"], ref_rate)
-    rates["stat_parity_diff"] = rates["selection_rate"] - ref_rate
-    rates["flag_80pct_rule"] = ~rates["disparate_impact"].between(DI_LOWER, DI_UPPER)
+    di = sr / (ref_rate if ref_rate > 0 else np.nan)
+    rates["disparate_impact"] = di
+    rates["stat_parity_diff"] = sr - ref_rate
+    # written as not-inside so NaN ratios are flagged, as with Series.between
+    rates["flag_80pct_rule"] = ~((di >= DI_LOWER) & (di <= DI_UPPER))
 
     cal = None
     if LABEL_COL in df:
@@ -187,3 +208,7 @@ def fairness_table(df: pd.DataFrame, group_col: str) -> Dict[str, pd.DataFrame]:
 
     return {
         "group": group_col,
+        "reference_group": {"reference_group": ref_group, "reference_rate": float(ref_rate)},
+        "rates": rates,
+        "calibration": cal,
+    }
@@ -4,16 +4,21 @@ This was migrated from copy_of_micro_project_recommender.py into a
 dedicated directory and renamed to `micro_project_recommender.py`.
 """
 
-import json, re, math
-from typing import List, Dict, Tuple
+import csv, json, re, math
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 import pandas as pd
 import numpy as np
 
 # Try to import SBERT; fall back to TF-IDF if not available
 USE_EMB = True
 try:
-    from sentence_transformers import SentenceTransformer, util as sbert_util
+    from sentence_transformers import SentenceTransformer
     EMB_MODEL = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+    import torch  # present whenever sentence-transformers is
+    if torch.cuda.is_available():
+        # fp16 on GPU: half the memory traffic, tensor-core matmuls
+        EMB_MODEL = EMB_MODEL.to("cuda").half()
 except Exception as e:
     print("Embeddings not available; falling back to TF-IDF only.", e)
     USE_EMB = False
@@ -68,8 +73,12 @@ if not essential_skills:
     essential_skills = infer_essential_skills(job_title)
 
 
+_NORM_RE = re.compile(r"[^a-z0-9#+]+")
+_SPLIT_RE = re.compile(r"[\,\s/()\-]+")
+
+
 def normalize_token(token: str) -> str:
-    return re.sub(r"[^a-z0-9#+]+", "", token.lower())
+    return _NORM_RE.sub("", token.lower())
 
 def cv_to_text(cv_obj: Dict) -> str:
     parts = []
@@ -111,7 +120,7 @@ def collect_skill_tokens(cv_obj: Dict) -> set:
         for s in sk: tokens.add(normalize_token(str(s)))
 
     text = cv_to_text(cv_obj)
-    for s in re.split(r"[\,\s/()\-]+", text):
+    for s in _SPLIT_RE.split(text):
         if s: tokens.add(normalize_token(s))
     return tokens
 
@@ -145,6 +154,8 @@ proj_df["text"] = (proj_df["title"] + " " + proj_df["tags"] + " " + proj_df["des
 PREF_DIFFICULTY_MAX = None
 PREF_TIME_BUDGET_DAYS = None
 
+EXPORT_FIELDS = ["missing_skill", "project_id", "title", "source", "url", "days", "difficulty", "score", "why"]
+
 df = proj_df.copy()
 if PREF_DIFFICULTY_MAX is not None:
     df = df[df["difficulty"] <= PREF_DIFFICULTY_MAX]
@@ -153,62 +164,101 @@ if PREF_TIME_BUDGET_DAYS is not None:
 df = df.reset_index(drop=True)
 
 
-def sbert_score(query: str, docs: List[str]) -> np.ndarray:
-    q_emb = EMB_MODEL.encode([query], convert_to_tensor=True, normalize_embeddings=True)
-    d_emb = EMB_MODEL.encode(docs, convert_to_tensor=True, normalize_embeddings=True)
-    sims = sbert_util.cos_sim(q_emb, d_emb).cpu().numpy()[0]
-    sims = (sims - sims.min()) / (sims.max() - sims.min() + 1e-8)
+@lru_cache(maxsize=8)
+def _doc_embeddings(docs: Tuple[str, ...]):
+    """Encode the catalog once; every later query reuses these embeddings."""
+    return EMB_MODEL.encode(list(docs), convert_to_tensor=True, normalize_embeddings=True, batch_size=32)
+
+
+def sbert_scores_batch(queries: List[str], docs: List[str]) -> np.ndarray:
+    q_emb = EMB_MODEL.encode(queries, convert_to_tensor=True, normalize_embeddings=True)
+    # embeddings are unit-length, so cosine is a plain matrix product
+    sims = (q_emb @ _doc_embeddings(tuple(docs)).T).float().cpu().numpy()
+    sims -= sims.min(axis=1, keepdims=True)
+    sims /= sims.max(axis=1, keepdims=True) + 1e-8
     return sims
 
 
-def tfidf_score(query: str, docs: List[str]) -> np.ndarray:
+def sbert_score(query: str, docs: List[str]) -> np.ndarray:
+    return sbert_scores_batch([query], docs)[0]
+
+
+@lru_cache(maxsize=8)
+def _tfidf_index(docs: Tuple[str, ...]):
+    """Fit the vocabulary once per catalog; queries only need a transform."""
     vec = TfidfVectorizer(ngram_range=(1,2), min_df=1)
-    X = vec.fit_transform([query] + docs)
-    sims = (X[0] @ X[1:].T).toarray()[0]
-    if sims.max() > 0: sims = sims / sims.max()
-    return sims
+    return vec, vec.fit_transform(docs)
 
 
-def semantic_scores(query: str, docs: List[str]) -> np.ndarray:
+def tfidf_scores_batch(queries: List[str], docs: List[str]) -> np.ndarray:
+    vec, D = _tfidf_index(tuple(docs))
+    sims = (vec.transform(queries) @ D.T).toarray()
+    top = sims.max(axis=1, keepdims=True)
+    return np.divide(sims, top, out=sims, where=top > 0)
+
+
+def tfidf_score(query: str, docs: List[str]) -> np.ndarray:
+    return tfidf_scores_batch([query], docs)[0]
+
+
+def semantic_scores_batch(queries: List[str], docs: List[str]) -> np.ndarray:
+    queries = [q.lower() for q in queries]
     if USE_EMB:
-        return sbert_score(query.lower(), docs)
-    return tfidf_score(query.lower(), docs)
-
-
-def recommend_for_skill(skill: str, df: pd.DataFrame, topk=3, role_hint: str = "") -> pd.DataFrame:
-    docs = df["text"].tolist()
-    query = f"{skill} for {role_hint}" if role_hint else skill
-    sims = semantic_scores(query, docs)
-    df = df.copy()
-    df["score"] = sims
-    df = df.sort_values("score", ascending=False)
-    picks, seen = [], set()
-    for _, row in df.iterrows():
-        key = row["title"].split()[0].lower()
-        if key not in seen:
-            picks.append(row)
-            seen.add(key)
-        if len(picks) >= topk:
+        return sbert_scores_batch(queries, docs)
+    return tfidf_scores_batch(queries, docs)
+
+
+def semantic_scores(query: str, docs: List[str]) -> np.ndarray:
+    return semantic_scores_batch([query], docs)[0]
+
+
+def _skill_query(skill: str, role_hint: str) -> str:
+    return f"{skill} for {role_hint}" if role_hint else skill
+
+
+def recommend_for_skill(skill: str, df: pd.DataFrame, topk=3, role_hint: str = "", sims: Optional[np.ndarray] = None) -> pd.DataFrame:
+    if sims is None:
+        sims = semantic_scores(_skill_query(skill, role_hint), df["text"].tolist())
+    sims = np.asarray(sims)
+    keys = df["title"].str.split().str[0].str.lower().to_numpy()
+    chosen_idx: List[int] = []
+    seen = set()
+    for i in np.argsort(-sims, kind="stable"):
+        if keys[i] not in seen:
+            chosen_idx.append(i)
+            seen.add(keys[i])
+        if len(chosen_idx) >= topk:
             break
-    return pd.DataFrame(picks)
+    return df.iloc[chosen_idx].assign(score=sims[chosen_idx])
 
 
 def recommend_projects(cv_obj: Dict, essential: List[str], project_df: pd.DataFrame, k_per_skill: int = 3, role_hint: str = "") -> Dict[str, pd.DataFrame]:
     missing, present = skill_gaps(cv_obj, essential)
+    if not missing:
+        return {}
+    # Score every missing skill against the catalog in one batched call
+    queries = [_skill_query(sk, role_hint) for sk in missing]
+    sims = semantic_scores_batch(queries, project_df["text"].tolist())
     out = {}
-    for sk in missing:
-        recs = recommend_for_skill(sk, project_df, topk=k_per_skill, role_hint=role_hint)
-        out[sk] = recs
+    for sk, row in zip(missing, sims):
+        out[sk] = recommend_for_skill(sk, project_df, topk=k_per_skill, role_hint=role_hint, sims=row)
     return out
 
 
 def explain_row(skill: str, row) -> str:
-    tokens = row["text"]
+    # attribute access works for both a Series row and an itertuples record
+    tokens = row.text
     if skill.lower() in tokens:
         return f"mentions “{skill}” directly"
     return "high semantic match to skill and tags"
 
 
+def explain_rows(skill: str, df: pd.DataFrame) -> np.ndarray:
+    """Vectorised explain_row over every row of `df`."""
+    direct = df["text"].str.contains(skill.lower(), regex=False)
+    return np.where(direct, f"mentions “{skill}” directly", "high semantic match to skill and tags")
+
+
 if __name__ == "__main__":
     missing_skills, present_skills = skill_gaps(cv, essential_skills)
     print("Present skills:", present_skills)
@@ -216,36 +266,40 @@ if __name__ == "__main__":
 
     recs_by_skill = recommend_projects(cv, essential_skills, df, k_per_skill=3, role_hint=job_title)
 
+    # one explanation pass per skill, shared by the report and the export
+    whys = {skill: explain_rows(skill, d) for skill, d in recs_by_skill.items()}
+
     print("\n=== Micro-Project Recommendations by Missing Skill ===")
     for skill, d in recs_by_skill.items():
         if d.empty:
             print(f"\n[ {skill} ] → No micro-projects found in catalog.")
             continue
         print(f"\n[ {skill} ]")
-        for _, r in d.iterrows():
-            print(f"- {r['title']} ({r['days']} days, diff {r['difficulty']})  | score≈{r['score']:.2f}  | src: {r['source']}  | why: {explain_row(skill, r)}")
-            print(f"  link: {r['url']}")
+        for r, why in zip(d.itertuples(index=False, name="Rec"), whys[skill]):
+            print(f"- {r.title} ({r.days} days, diff {r.difficulty})  | score≈{r.score:.2f}  | src: {r.source}  | why: {why}")
+            print(f"  link: {r.url}")
 
     rows = []
     for skill, d in recs_by_skill.items():
-        for _, r in d.iterrows():
+        for r, why in zip(d.itertuples(index=False, name="Rec"), whys[skill]):
             rows.append({
                 "missing_skill": skill,
-                "project_id": r["id"],
-                "title": r["title"],
-                "source": r["source"],
-                "url": r["url"],
-                "days": int(r["days"]),
-                "difficulty": int(r["difficulty"]),
-                "score": round(float(r["score"]), 3),
-                "why": explain_row(skill, r)
+                "project_id": r.id,
+                "title": r.title,
+                "source": r.source,
+                "url": r.url,
+                "days": int(r.days),
+                "difficulty": int(r.difficulty),
+                "score": round(float(r.score), 3),
+                "why": str(why)
             })
-    merged = pd.DataFrame(rows)
-    merged if len(merged) else pd.DataFrame([{"info":"No recommendations; catalog empty or no missing skills."}])
-
-    if 'merged' in globals() and len(merged):
+    if rows:
         out_csv = "micro_project_recs.csv"
-        merged.to_csv(out_csv, index=False)
+        # rows go straight to disk; no intermediate DataFrame
+        with open(out_csv, "w", encoding="utf-8", newline="", buffering=1 << 20) as f:
+            w = csv.DictWriter(f, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+            w.writeheader()
+            w.writerows(rows)
         print("Saved:", out_csv)
     else:
-        print("No merged results to export.")
+        print("No recommendations; catalog empty or no missing skills.")
@@ -4,20 +4,47 @@ Moved from `copy_of_skill_gap_course_recommender.py` and renamed to
 `course_recommender.py` to match the numbered directory layout.
 """
 
-import json, re
+import json, re, os, hashlib, shelve
+from collections import OrderedDict
+from functools import lru_cache
 from typing import List, Dict, Tuple
 import pandas as pd
 import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
 
 USE_EMB = True
 try:
-    from sentence_transformers import SentenceTransformer, util as sbert_util
-    EMB_MODEL = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+    from sentence_transformers import SentenceTransformer
 except Exception as e:
     print("Embeddings not available; falling back to TF-IDF only.", e)
     USE_EMB = False
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
+
+# Optional ANN index for large catalogs; exhaustive scoring is used otherwise.
+try:
+    import faiss
+except ImportError:
+    faiss = None
+ANN_MIN_CATALOG = 256
+
+EMB_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+EMB_CACHE_PATH = os.path.expanduser("~/.cache/careermatch/emb.db")
+
+
+@lru_cache(maxsize=1)
+def _emb_model():
+    """Load the SBERT model on first use (not at import); None if it fails."""
+    global USE_EMB
+    try:
+        model = SentenceTransformer(EMB_MODEL_NAME)
+        import torch  # present whenever sentence-transformers is
+        if torch.cuda.is_available():
+            # fp16 on GPU: half the memory traffic, tensor-core matmuls
+            model = model.to("cuda").half()
+        return model
+    except Exception as e:
+        print("Embeddings not available; falling back to TF-IDF only.", e)
+        USE_EMB = False
+        return None
 
 try:
     from google.colab import files
@@ -54,73 +81,132 @@ DEFAULT_SKILLS_BY_TITLE = {
     "data analyst": ["SQL","Excel","Python","Pandas","Data Visualization","Power BI","Tableau"],
 }
 
+# One alternation over every known title; re.escape keeps keys literal.
+_TITLE_RE = re.compile("|".join(re.escape(k) for k in DEFAULT_SKILLS_BY_TITLE))
+
+
 def infer_essential_skills(title: str) -> List[str]:
     t = (title or "").strip().lower()
-    for k, v in DEFAULT_SKILLS_BY_TITLE.items():
-        if k in t:
-            return v
+    m = _TITLE_RE.search(t)
+    if m:
+        return DEFAULT_SKILLS_BY_TITLE[m.group(0)]
     return ["Python","SQL","Git"]
 
 if not essential_skills:
     essential_skills = infer_essential_skills(job_title)
 
 
+_NORM_RE = re.compile(r"[^a-z0-9#+]+")
+_SPLIT_RE = re.compile(r"[\,\s/()\-]+")
+
+
 def normalize_token(token: str) -> str:
-    return re.sub(r"[^a-z0-9#+]+", "", token.lower())
+    return _NORM_RE.sub("", token.lower())
 
-def cv_to_text(cv_obj: Dict) -> str:
-    parts = []
+# Exact-type dispatch for CV field values (one dict lookup instead of an
+# isinstance ladder); JSON-parsed CVs only ever hold these builtin types.
+_HANDLERS = {list: lambda v: " ".join(map(str, v)), str: lambda v: v}
+_SKILL_ITEMS = {list: lambda v: v, str: lambda v: (v,)}
+
+
+def _stringify(v) -> str:
+    h = _HANDLERS.get(type(v))
+    return h(v) if h else str(v)
+
+
+def _iter_cv_strings(cv_obj: Dict):
+    """Yield the CV's text fragments in cv_to_text order."""
     if cv_obj.get("summary"):
-        parts.append(str(cv_obj["summary"]))
+        yield str(cv_obj["summary"])
 
     sk = cv_obj.get("skills")
-    if isinstance(sk, dict):
+    if type(sk) is dict:
         for v in sk.values():
-            if isinstance(v, list): parts.append(" ".join(map(str, v)))
-            elif isinstance(v, str): parts.append(v)
-    elif isinstance(sk, list):
-        parts.append(" ".join(map(str, sk)))
+            h = _HANDLERS.get(type(v))
+            if h: yield h(v)
+    elif type(sk) is list:
+        yield _stringify(sk)
 
     for p in cv_obj.get("projects", []) or []:
-        if isinstance(p, dict):
+        if type(p) is dict:
             for k in ("name","description","tech"):
                 if p.get(k):
-                    if isinstance(p[k], list): parts.append(" ".join(map(str, p[k])))
-                    else: parts.append(str(p[k]))
+                    yield _stringify(p[k])
         else:
-            parts.append(str(p))
+            yield str(p)
 
     for key in ["experience","education","certifications"]:
         if key in cv_obj and cv_obj[key]:
-            parts.append(str(cv_obj[key]))
-    return "\n".join(parts)
+            yield str(cv_obj[key])
 
 
-def collect_skill_tokens(cv_obj: Dict) -> set:
+def cv_to_text(cv_obj: Dict) -> str:
+    return "\n".join(_iter_cv_strings(cv_obj))
+
+
+_TOKEN_CACHE_SIZE = 256
+_token_cache: "OrderedDict[tuple, frozenset]" = OrderedDict()
+
+
+def _freeze(obj):
+    """Hashable, type-tagged snapshot of a CV value (dict order ignored).
+    Raises TypeError for values that cannot be hashed."""
+    t = type(obj)
+    if t is dict:
+        return (dict, frozenset((k, _freeze(v)) for k, v in obj.items()))
+    if t in (list, tuple):
+        return (t, tuple(_freeze(v) for v in obj))
+    if t in (set, frozenset):
+        return (frozenset, frozenset(_freeze(v) for v in obj))
+    hash(obj)
+    return (t, obj)
+
+
+def collect_skill_tokens(cv_obj: Dict) -> frozenset:
+    """Normalised skill tokens for a CV, memoised on a frozen copy of it."""
+    try:
+        key = _freeze(cv_obj)
+    except TypeError:
+        return frozenset(_collect_skill_tokens(cv_obj))
+    tokens = _token_cache.get(key)
+    if tokens is None:
+        tokens = _token_cache[key] = frozenset(_collect_skill_tokens(cv_obj))
+        if len(_token_cache) > _TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    else:
+        _token_cache.move_to_end(key)
+    return tokens
+
+
+def _collect_skill_tokens(cv_obj: Dict) -> set:
     tokens = set()
     sk = cv_obj.get("skills")
-    if isinstance(sk, dict):
-        for v in sk.values():
-            if isinstance(v, list):
-                for s in v: tokens.add(normalize_token(str(s)))
-            elif isinstance(v, str):
-                tokens.add(normalize_token(v))
-    elif isinstance(sk, list):
-        for s in sk: tokens.add(normalize_token(str(s)))
-    text = cv_to_text(cv_obj)
-    for s in re.split(r"[\,\s/()\-]+", text):
-        if s: tokens.add(normalize_token(s))
+    groups = sk.values() if type(sk) is dict else (sk,) if type(sk) is list else ()
+    for v in groups:
+        items = _SKILL_ITEMS.get(type(v))
+        if items:
+            tokens.update(normalize_token(str(s)) for s in items(v))
+    # tokenise fragment by fragment rather than joining the whole CV first
+    for frag in _iter_cv_strings(cv_obj):
+        tokens.update(_NORM_RE.sub("", s) for s in _SPLIT_RE.split(frag.lower()) if s)
     return tokens
 
 
+_ISIN_MIN_SKILLS = 64
+
+
 def skill_gaps(cv_obj: Dict, essential: List[str]) -> Tuple[List[str], List[str]]:
     have = collect_skill_tokens(cv_obj)
-    req = [normalize_token(s) for s in essential]
-    missing, present = [], []
-    for raw in essential:
-        tok = normalize_token(raw)
-        if tok in have: present.append(raw)
-        else: missing.append(raw)
+    if len(essential) > _ISIN_MIN_SKILLS:
+        # large essentials lists (e.g. several role templates): one bulk isin
+        req_arr = np.array([normalize_token(raw) for raw in essential], dtype=object)
+        mask = np.isin(req_arr, np.fromiter(have, dtype=object, count=len(have)))
+        present = [essential[i] for i in np.flatnonzero(mask)]
+        missing = [essential[i] for i in np.flatnonzero(~mask)]
+        return missing, present
+    pairs = [(raw, normalize_token(raw)) for raw in essential]
+    present = [raw for raw, tok in pairs if tok in have]
+    missing = [raw for raw, tok in pairs if tok not in have]
     return missing, present
 
 
@@ -138,99 +224,242 @@ data = [
 ]
 catalog = pd.DataFrame(data, columns=["id","title","provider","hours","level","description"])
 catalog["text"] = (catalog["title"] + " " + catalog["description"]).str.lower()
+# dedupe key used by recommend_for_skill, computed once for the static catalog
+catalog["_first_word"] = catalog["title"].str.split().str[0].str.lower()
 
 TIME_BUDGET_H = None
 if TIME_BUDGET_H is not None:
     catalog = catalog[catalog["hours"] <= TIME_BUDGET_H].reset_index(drop=True)
 
 
-def sbert_score(query: str, docs: List[str]) -> np.ndarray:
-    q_emb = EMB_MODEL.encode([query], convert_to_tensor=True, normalize_embeddings=True)
-    d_emb = EMB_MODEL.encode(docs, convert_to_tensor=True, normalize_embeddings=True)
-    sims = sbert_util.cos_sim(q_emb, d_emb).cpu().numpy()[0]
-    sims = (sims - sims.min()) / (sims.max() - sims.min() + 1e-8)
+def cached_encode(texts: List[str]) -> np.ndarray:
+    """L2-normalised embeddings for texts, reusing fp16 vectors stored on disk.
+
+    Keys are SHA1 of (model name, text); only cache misses hit the model, in
+    one batch. If the cache file can't be used, everything is encoded.
+    """
+    keys = [hashlib.sha1(f"{EMB_MODEL_NAME}|{t}".encode("utf-8")).hexdigest() for t in texts]
+    vecs = [None] * len(texts)
+    try:
+        os.makedirs(os.path.dirname(EMB_CACHE_PATH), exist_ok=True)
+        with shelve.open(EMB_CACHE_PATH) as db:
+            for i, k in enumerate(keys):
+                vecs[i] = db.get(k)
+    except Exception:
+        pass
+
+    miss = [i for i, v in enumerate(vecs) if v is None]
+    if miss:
+        new = _emb_model().encode([texts[i] for i in miss], batch_size=32,
+                                  convert_to_numpy=True, normalize_embeddings=True)
+        for i, v in zip(miss, new):
+            vecs[i] = v.astype(np.float16)
+        try:
+            with shelve.open(EMB_CACHE_PATH) as db:
+                for i in miss:
+                    db[keys[i]] = vecs[i]
+        except Exception:
+            pass
+    return np.vstack(vecs).astype(np.float32)
+
+
+def quantize_i8(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantisation: x ~= x_i8 * scale."""
+    scale = np.abs(x).max(axis=-1, keepdims=True) / 127.0
+    scale[scale == 0] = 1.0
+    return np.round(x / scale).astype(np.int8), scale.astype(np.float32)
+
+
+@lru_cache(maxsize=8)
+def _doc_embeddings(docs: Tuple[str, ...]) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode a catalog once and keep it int8-quantised (4x smaller than fp32)."""
+    return quantize_i8(cached_encode(list(docs)))
+
+
+def sbert_scores_batch(queries: List[str], docs: List[str]) -> np.ndarray:
+    """(Q x D) similarities, each row min-max scaled, from one batched encode.
+
+    Embeddings are L2-normalised, so cosine is an int8 dot product (accumulated
+    in int32) rescaled by the outer product of the per-vector scales.
+    """
+    q_i8, q_scale = quantize_i8(cached_encode(queries))
+    c_i8, c_scale = _doc_embeddings(tuple(docs))
+    sims = (q_i8.astype(np.int32) @ c_i8.astype(np.int32).T) * (q_scale * c_scale.T)
+    # min-max scale each row in place (after the shift, max == ptp)
+    sims -= sims.min(axis=1, keepdims=True)
+    sims /= sims.max(axis=1, keepdims=True) + 1e-8
     return sims
 
 
+def sbert_score(query: str, docs: List[str]) -> np.ndarray:
+    return sbert_scores_batch([query], docs)[0]
+
+
+# Stateless term hashing (no vocabulary dict); only the IDF weights are fit.
+_HV = HashingVectorizer(n_features=2**18, ngram_range=(1,2), alternate_sign=False, norm=None)
+
+
+@lru_cache(maxsize=8)
+def _tfidf_index(docs: Tuple[str, ...]):
+    """Fit IDF once per catalog; later queries only need a transform."""
+    idf = TfidfTransformer()
+    return idf, idf.fit_transform(_HV.transform(docs))
+
+
+def tfidf_scores_batch(queries: List[str], docs: List[str]) -> np.ndarray:
+    idf, D = _tfidf_index(tuple(docs))
+    sims = (idf.transform(_HV.transform(queries)) @ D.T).toarray()
+    top = sims.max(axis=1, keepdims=True)
+    return np.divide(sims, top, out=sims, where=top > 0)
+
+
 def tfidf_score(query: str, docs: List[str]) -> np.ndarray:
-    vec = TfidfVectorizer(ngram_range=(1,2), min_df=1)
-    X = vec.fit_transform([query] + docs)
-    sims = (X[0] @ X[1:].T).toarray()[0]
-    if sims.max() > 0: sims = sims / sims.max()
-    return sims
+    return tfidf_scores_batch([query], docs)[0]
+
+
+def semantic_scores_batch(queries: List[str], docs: List[str]) -> np.ndarray:
+    queries = [q.lower() for q in queries]
+    if USE_EMB and _emb_model() is not None:
+        return sbert_scores_batch(queries, docs)
+    return tfidf_scores_batch(queries, docs)
 
 
 def semantic_scores(query: str, docs: List[str]) -> np.ndarray:
-    if USE_EMB:
-        return sbert_score(query.lower(), docs)
-    return tfidf_score(query.lower(), docs)
-
-
-def recommend_for_skill(skill: str, df: pd.DataFrame, topk=3) -> pd.DataFrame:
-    docs = df["text"].tolist()
-    sims = semantic_scores(skill, docs)
-    df = df.copy()
-    df["score"] = sims
-    df = df.sort_values("score", ascending=False)
-    picks, seen = [], set()
-    for _, row in df.iterrows():
-        key = row["title"].split()[0].lower()
-        if key not in seen:
-            picks.append(row)
-            seen.add(key)
-        if len(picks) >= topk:
+    return semantic_scores_batch([query], docs)[0]
+
+
+@lru_cache(maxsize=8)
+def _ann_index(docs: Tuple[str, ...]):
+    """HNSW index (inner product == cosine on unit vectors), built once per catalog."""
+    emb = cached_encode(list(docs))
+    index = faiss.IndexHNSWFlat(emb.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+    index.add(emb)
+    return index
+
+
+def ann_scores_batch(queries: List[str], docs: List[str], k: int) -> np.ndarray:
+    """(Q x D) similarities for each query's k nearest docs, each row min-max
+    scaled over its hits as in sbert_scores_batch; other entries are -inf."""
+    q = cached_encode([q.lower() for q in queries])
+    sims, idx = _ann_index(tuple(docs)).search(q, min(k, len(docs)))
+    hit = idx >= 0
+    # min-max over the hits only (faiss pads missing neighbours with id -1)
+    lo = np.where(hit, sims, np.inf).min(axis=1, keepdims=True)
+    hi = np.where(hit, sims, -np.inf).max(axis=1, keepdims=True)
+    scaled = (sims - lo) / (hi - lo + 1e-8)
+    out = np.full((len(queries), len(docs)), -np.inf, dtype=np.float32)
+    rows = np.repeat(np.arange(len(queries)), idx.shape[1]).reshape(idx.shape)
+    out[rows[hit], idx[hit]] = scaled[hit]
+    return out
+
+
+def recommend_for_skill(skill: str, df: pd.DataFrame, topk=3, sims: np.ndarray = None) -> pd.DataFrame:
+    if sims is None:
+        sims = semantic_scores(skill, df["text"].tolist())
+    sims = np.asarray(sims)
+    if "_first_word" in df:
+        keys = df["_first_word"].to_numpy()
+    else:
+        keys = df["title"].str.split().str[0].str.lower().to_numpy()
+
+    # docs outside an ANN search are -inf and never recommended, so the
+    # result can be shorter than topk
+    pool = np.flatnonzero(np.isfinite(sims))
+    # Partial sort: only the best topk*4 candidates are ordered, which is
+    # plenty unless many titles share a first word (then sort everything).
+    n_cand = min(topk * 4, len(pool))
+    picks: List[int] = []
+    for cand in (n_cand, len(pool)):
+        idx = pool[np.argpartition(-sims[pool], cand - 1)[:cand]] if 0 < cand < len(pool) else pool
+        idx = idx[np.lexsort((idx, -sims[idx]))]  # by score desc, ties by position
+        picks, seen = [], set()
+        for i in idx:
+            if keys[i] not in seen:
+                picks.append(i)
+                seen.add(keys[i])
+            if len(picks) >= topk:
+                break
+        if len(picks) >= topk or cand == len(pool):
             break
-    return pd.DataFrame(picks)
+    return df.iloc[picks].assign(score=sims[picks])
+
 
+def recommend_courses(cv_obj: Dict, essential: List[str], catalog_df: pd.DataFrame, k_per_skill: int = 3) -> pd.DataFrame:
+    """Recommendations for every missing skill as one long frame.
 
-def recommend_courses(cv_obj: Dict, essential: List[str], catalog_df: pd.DataFrame, k_per_skill: int = 3) -> Dict[str, pd.DataFrame]:
+    Rows carry a `missing_skill` column; use recommend_courses_grouped for
+    the per-skill dict layout.
+    """
     missing, present = skill_gaps(cv_obj, essential)
-    out = {}
-    for sk in missing:
-        recs = recommend_for_skill(sk, catalog_df, topk=k_per_skill)
-        out[sk] = recs
+    if not missing:
+        cols = ["missing_skill"] + list(catalog_df.columns) + ["score", "_direct"]
+        return pd.DataFrame(columns=cols)
+    # one batched scoring pass for every missing skill, then one row per skill
+    docs = catalog_df["text"].tolist()
+    use_ann = faiss is not None and len(docs) >= ANN_MIN_CATALOG and USE_EMB and _emb_model() is not None
+    k = k_per_skill * 4
+    if use_ann:
+        all_sims = ann_scores_batch(missing, docs, k)
+    else:
+        all_sims = semantic_scores_batch(missing, docs)
+    parts = []
+    for sk, sims in zip(missing, all_sims):
+        recs = recommend_for_skill(sk, catalog_df, topk=k_per_skill, sims=sims)
+        # too few distinct titles among the neighbours: search wider
+        k_sk = k
+        while use_ann and len(recs) < k_per_skill and k_sk < len(docs):
+            k_sk = min(k_sk * 4, len(docs))
+            recs = recommend_for_skill(sk, catalog_df, topk=k_per_skill, sims=ann_scores_batch([sk], docs, k_sk)[0])
+        parts.append(recs.assign(missing_skill=sk))
+    out = pd.concat(parts, ignore_index=True)
+    out = out[["missing_skill"] + [c for c in out.columns if c != "missing_skill"]]
+    # "mentions the skill directly" flag, checked row-wise in one pass
+    out["_direct"] = [sk.lower() in text for sk, text in zip(out["missing_skill"], out["text"])]
     return out
 
 
+def recommend_courses_grouped(cv_obj: Dict, essential: List[str], catalog_df: pd.DataFrame, k_per_skill: int = 3) -> Dict[str, pd.DataFrame]:
+    """Per-skill view of recommend_courses: {missing_skill: recommendations}."""
+    recs = recommend_courses(cv_obj, essential, catalog_df, k_per_skill)
+    return {sk: g.drop(columns="missing_skill") for sk, g in recs.groupby("missing_skill", sort=False)}
+
+
 def explain_row(skill: str, row) -> str:
-    if skill.lower() in row["text"]:
+    direct = row["_direct"] if "_direct" in row else skill.lower() in row["text"]
+    if direct:
         return f"mentions “{skill}” directly"
     return "high semantic similarity to skill"
 
 
+def explain_rows(skill, df: pd.DataFrame) -> np.ndarray:
+    """Vectorised explain_row; `skill` may be a string or a per-row Series."""
+    direct = df["_direct"] if "_direct" in df else df["text"].str.contains(skill.lower(), regex=False)
+    return np.where(direct, "mentions “" + skill + "” directly", "high semantic similarity to skill")
+
+
 if __name__ == "__main__":
     missing_skills, present_skills = skill_gaps(cv, essential_skills)
     print("Present skills:", present_skills)
     print("Missing skills:", missing_skills)
 
-    recs_by_skill = recommend_courses(cv, essential_skills, catalog, k_per_skill=3)
+    recs = recommend_courses(cv, essential_skills, catalog, k_per_skill=3)
+    recs_by_skill = dict(tuple(recs.groupby("missing_skill", sort=False)))
 
     print("\n=== Course Recommendations by Missing Skill ===")
-    for skill, df in recs_by_skill.items():
-        if df.empty:
+    for skill in missing_skills:
+        df = recs_by_skill.get(skill)
+        if df is None or df.empty:
             print(f"\n[ {skill} ] → No courses found in catalog.")
             continue
         print(f"\n[ {skill} ]")
-        for _, r in df.iterrows():
-            print(f"- {r['title']} ({r['provider']}, {r['hours']}h)  | score≈{r['score']:.2f}  | why: {explain_row(skill, r)}")
-
-    rows = []
-    for skill, df in recs_by_skill.items():
-        for _, r in df.iterrows():
-            rows.append({
-                "missing_skill": skill,
-                "course_id": r["id"],
-                "title": r["title"],
-                "provider": r["provider"],
-                "hours": r["hours"],
-                "level": r["level"],
-                "score": round(float(r["score"]), 3),
-                "why": explain_row(skill, r)
-            })
-    merged = pd.DataFrame(rows)
-    merged if len(merged) else pd.DataFrame([{"info":"No recommendations; catalog empty or no missing skills."}])
-
-    if 'merged' in globals() and len(merged):
+        for r, why in zip(df[["title", "provider", "hours", "score"]].itertuples(index=False), explain_rows(skill, df)):
+            print(f"- {r.title} ({r.provider}, {r.hours}h)  | score≈{r.score:.2f}  | why: {why}")
+
+    merged = recs[["missing_skill", "id", "title", "provider", "hours", "level", "score"]].rename(columns={"id": "course_id"})
+    merged["score"] = merged["score"].astype(float).round(3)
+    merged["why"] = explain_rows(recs["missing_skill"], recs)
+
+    if len(merged):
         out_csv = "course_recs.csv"
         merged.to_csv(out_csv, index=False)
         print("Saved:", out_csv)
@@ -4,11 +4,11 @@
 Provides scoring helpers (strength, relevance, completeness) and explainers.
 """
 
-import json, re
-from typing import List, Dict, Tuple
+import json, re, math, string
+from collections import Counter
+from typing import List, Dict, Optional, Tuple
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.feature_extraction.text import CountVectorizer
 
 try:
     from google.colab import files
@@ -55,20 +55,39 @@ if not essential_skills:
     essential_skills = infer_essential_skills(job_title)
 
 
-def normalize_token(token: str) -> str:
-    return re.sub(r"[^a-z0-9#+]+", "", token.lower())
+_NORM_RE = re.compile(r"[^a-z0-9#+]+")
+_SPLIT_RE = re.compile(r"[,\s/()\-]+")
+# ASCII fast path for normalize_token: bytes.translate deletes every byte
+# outside [a-z0-9#+] in one C loop (str.translate goes through a dict lookup).
+_KEEP = set(string.ascii_lowercase + string.digits + "#+")
+_DEL_BYTES = bytes(i for i in range(128) if chr(i) not in _KEEP)
 
-def cv_to_text(cv_obj: Dict) -> str:
-    parts = []
+
+def normalize_token(token: str) -> str:
+    token = token.lower()
+    if token.isascii():
+        return token.encode().translate(None, _DEL_BYTES).decode()
+    return _NORM_RE.sub("", token)
+
+def _walk_cv(cv_obj: Dict):
+    """Single walk over the CV: (structured skill strings, joined CV text).
+    The skills field feeds both outputs, so it is only visited once."""
+    parts, skill_strs = [], []
     if cv_obj.get("summary"): parts.append(str(cv_obj["summary"]))
 
     sk = cv_obj.get("skills")
     if isinstance(sk, dict):
         for v in sk.values():
-            if isinstance(v, list): parts.append(" ".join(map(str, v)))
-            elif isinstance(v, str): parts.append(v)
+            if isinstance(v, list):
+                strs = [str(s) for s in v]
+                skill_strs.extend(strs)
+                parts.append(" ".join(strs))
+            elif isinstance(v, str):
+                skill_strs.append(v)
+                parts.append(v)
     elif isinstance(sk, list):
-        parts.append(" ".join(map(str, sk)))
+        skill_strs = [str(s) for s in sk]
+        parts.append(" ".join(skill_strs))
 
     for p in cv_obj.get("projects", []) or []:
         if isinstance(p, dict):
@@ -82,78 +101,119 @@ def cv_to_text(cv_obj: Dict) -> str:
     for key in ["experience","education","certifications"]:
         if key in cv_obj and cv_obj[key]:
             parts.append(str(cv_obj[key]))
-    return "\n".join(parts)
+    return skill_strs, "\n".join(parts)
 
 
-def collect_skill_tokens(cv_obj: Dict) -> set:
-    tokens = set()
-    sk = cv_obj.get("skills")
-    if isinstance(sk, dict):
-        for v in sk.values():
-            if isinstance(v, list):
-                for s in v: tokens.add(normalize_token(str(s)))
-            elif isinstance(v, str):
-                tokens.add(normalize_token(v))
-    elif isinstance(sk, list):
-        for s in sk: tokens.add(normalize_token(str(s)))
-    text = cv_to_text(cv_obj)
-    for s in re.split(r"[,\s/()\-]+", text):
+def _tokens_from(skill_strs, text: str) -> set:
+    tokens = {normalize_token(s) for s in skill_strs}
+    for s in _SPLIT_RE.split(text):
         if s: tokens.add(normalize_token(s))
     return tokens
 
 
+def cv_to_text(cv_obj: Dict) -> str:
+    return _walk_cv(cv_obj)[1]
+
+
+def collect_skill_tokens(cv_obj: Dict) -> set:
+    """Normalised skill tokens from the skills lists and the CV text."""
+    return _tokens_from(*_walk_cv(cv_obj))
+
+
+def _skill_coverage(have: set, essential_skills):
+    """One pass over the essentials: (completeness %, missing skills, normalized req).
+    completeness_score, skills_proxy and find_missing_skills all delegate here."""
+    return _coverage_from_pairs(have, _essential_pairs(essential_skills))
+
+
+def _essential_pairs(essential_skills):
+    return [(s, normalize_token(s)) for s in (essential_skills or [])]
+
+
+def _coverage_from_pairs(have: set, pairs):
+    req = [n for _, n in pairs]
+    missing = [s for s, n in pairs if n not in have]
+    if not req:
+        return 0.0, missing, req
+    return ((len(req) - len(missing)) / len(req)) * 100.0, missing, req
+
+
+def _completeness_from(have: set, essential_skills) -> float:
+    return _skill_coverage(have, essential_skills)[0]
+
+
 def completeness_score(cv_obj: Dict, essential_skills):
-    req = [normalize_token(s) for s in (essential_skills or [])]
-    if not req: return 0.0
-    have = collect_skill_tokens(cv_obj)
-    present = sum(1 for s in req if s in have)
-    return (present / len(req)) * 100.0
+    if not essential_skills: return 0.0
+    return _completeness_from(collect_skill_tokens(cv_obj), essential_skills)
+
+
+# Same tokenisation as TfidfVectorizer(ngram_range=(1,2)); building the analyzer needs no fit
+_ANALYZE = CountVectorizer(ngram_range=(1,2)).build_analyzer()
+_IDF_SINGLE = 1.0 + math.log(1.5)
 
 
 def relevance_score(cv_obj: Dict, job_text: str) -> float:
-    cv_text = cv_to_text(cv_obj).strip()
+    return _relevance_from(cv_to_text(cv_obj), job_text)
+
+
+def _relevance_from(cv_text: str, job_text: str) -> float:
     job_text = (job_text or "").strip()
-    if not cv_text or not job_text: return 0.0
-    vec = TfidfVectorizer(ngram_range=(1,2), min_df=1)
-    X = vec.fit_transform([cv_text, job_text])
-    return float(cosine_similarity(X[0], X[1])[0][0] * 100.0)
+    return _relevance_counts(cv_text, Counter(_ANALYZE(job_text)) if job_text else None)
+
+
+def _relevance_counts(cv_text: str, b: Optional[Counter]) -> float:
+    """_relevance_from with the job text already analysed into term counts
+    (None for an empty job text), so a batch analyses it once."""
+    cv_text = cv_text.strip()
+    if not cv_text or b is None: return 0.0
+    a = Counter(_ANALYZE(cv_text))
+    # TF-IDF over exactly two documents needs no fitted vocabulary: the smoothed
+    # idf is 1 for terms in both texts and 1 + ln(3/2) for terms in only one.
+    dot = sum(n * b[t] for t, n in a.items() if t in b)
+    if not dot: return 0.0
+    norm_a = math.sqrt(sum((n if t in b else n * _IDF_SINGLE) ** 2 for t, n in a.items()))
+    norm_b = math.sqrt(sum((n if t in a else n * _IDF_SINGLE) ** 2 for t, n in b.items()))
+    return float(dot / (norm_a * norm_b) * 100.0)
+
+
+_EDU_RE = re.compile(r"\b(bachelor|undergraduate|bsc|bs|ba|msc|master|phd)\b")
 
 
 def presence_score_any(cv_obj: Dict, key: str) -> float:
-    val = cv_obj.get(key)
-    if not val: return 0.0
-    if isinstance(val, (list, dict)): return 1.0 if len(val) > 0 else 0.0
-    return 1.0
+    # empty containers and strings are falsy, so truthiness is the whole check
+    return float(bool(cv_obj.get(key)))
 
 
 def education_proxy(cv_obj: Dict) -> float:
-    if presence_score_any(cv_obj, "education") > 0: return 1.0
-    summary = cv_obj.get("summary", "") or ""
-    return 0.7 if re.search(r"\b(bachelor|undergraduate|bsc|bs|ba|msc|master|phd)\b", summary.lower()) else 0.0
+    if cv_obj.get("education"): return 1.0
+    return 0.7 * bool(_EDU_RE.search((cv_obj.get("summary") or "").lower()))
 
 
 def experience_proxy(cv_obj: Dict) -> float:
-    return presence_score_any(cv_obj, "experience")
+    return float(bool(cv_obj.get("experience")))
 
 
 def projects_proxy(cv_obj: Dict) -> float:
-    projects = cv_obj.get("projects", []) or []
-    return min(1.0, (len(projects) if isinstance(projects, list) else 1) / 5.0)
+    projects = cv_obj.get("projects")
+    return min(1.0, (len(projects) if isinstance(projects, list) else bool(projects)) / 5.0)
 
 
-def skills_proxy(cv_obj: Dict, essential_skills) -> float:
-    return completeness_score(cv_obj, essential_skills) / 100.0
+def skills_proxy(cv_obj: Dict, essential_skills, tokens: Optional[set] = None) -> float:
+    if tokens is None:
+        return completeness_score(cv_obj, essential_skills) / 100.0
+    return _completeness_from(tokens, essential_skills) / 100.0
 
 
 def certifications_proxy(cv_obj: Dict) -> float:
-    return presence_score_any(cv_obj, "certifications")
+    return float(bool(cv_obj.get("certifications")))
 
 
-def strength_score(cv_obj: Dict, essential_skills, weights: Dict[str, float]) -> Dict[str, float]:
+def strength_score(cv_obj: Dict, essential_skills, weights: Dict[str, float], tokens: Optional[set] = None,
+                   completeness: Optional[float] = None) -> Dict[str, float]:
     Edu  = education_proxy(cv_obj)
     Exp  = experience_proxy(cv_obj)
     Proj = projects_proxy(cv_obj)
-    Skills = skills_proxy(cv_obj, essential_skills)
+    Skills = completeness / 100.0 if completeness is not None else skills_proxy(cv_obj, essential_skills, tokens)
     Cert = certifications_proxy(cv_obj)
     wsum = sum(weights.values()) or 1.0
     w = {k: v/wsum for k, v in weights.items()}
@@ -161,8 +221,42 @@ def strength_score(cv_obj: Dict, essential_skills, weights: Dict[str, float]) ->
     return {"S": float(S), "Edu": float(Edu), "Exp": float(Exp), "Proj": float(Proj), "Skills": float(Skills), "Cert": float(Cert)}
 
 
-def make_explanation(scores: Dict[str,float], subs: Dict[str,float], cv_obj: Dict, essentials, job_title: str):
-    missing = find_missing_skills(cv_obj, essentials)
+def score_cv(cv_obj: Dict, essential_skills, job_text: str, weights: Dict[str, float]) -> Dict:
+    """Completeness, relevance, strength and missing skills from a single walk
+    over the CV: its text, token set and skill coverage are computed once and shared."""
+    skill_strs, text = _walk_cv(cv_obj)
+    tokens = _tokens_from(skill_strs, text)
+    C, missing, _ = _skill_coverage(tokens, essential_skills)
+    return {
+        "C": C,
+        "R": _relevance_from(text, job_text),
+        "S": strength_score(cv_obj, essential_skills, weights, completeness=C),
+        "missing": missing,
+    }
+
+
+def score_cv_batch(cv_objs: List[Dict], essential_skills, job_text: str, weights: Dict[str, float]) -> List[Dict]:
+    """score_cv over many CVs for one job: the essentials are normalised and the
+    job text analysed once for the whole batch."""
+    pairs = _essential_pairs(essential_skills)
+    job_text = (job_text or "").strip()
+    job_counts = Counter(_ANALYZE(job_text)) if job_text else None
+    out = []
+    for cv_obj in cv_objs:
+        skill_strs, text = _walk_cv(cv_obj)
+        C, missing, _ = _coverage_from_pairs(_tokens_from(skill_strs, text), pairs)
+        out.append({
+            "C": C,
+            "R": _relevance_counts(text, job_counts),
+            "S": strength_score(cv_obj, essential_skills, weights, completeness=C),
+            "missing": missing,
+        })
+    return out
+
+
+def make_explanation(scores: Dict[str,float], subs: Dict[str,float], cv_obj: Dict, essentials, job_title: str, missing: Optional[List[str]] = None):
+    if missing is None:
+        missing = find_missing_skills(cv_obj, essentials)
     summary = (
         f"Overall readiness for **{job_title}** looks **{pct_band(scores['Strength_S'])}** "
         f"(Strength {scores['Strength_S']} / 100). "
@@ -208,6 +302,8 @@ def subscore_comment(name: str, v: float) -> str:
 
 
 def find_missing_skills(cv_obj: Dict, essentials):
-    req = [normalize_token(s) for s in (essentials or [])]
-    have = collect_skill_tokens(cv_obj)
-    return [s for s in essentials if normalize_token(s) not in have]
+    return _missing_from(collect_skill_tokens(cv_obj), essentials)
+
+
+def _missing_from(have: set, essentials):
+    return _skill_coverage(have, essentials)[1]
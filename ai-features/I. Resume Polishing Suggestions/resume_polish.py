@@ -2,64 +2,332 @@
 
 import streamlit as st
 import ollama
+import asyncio
+import atexit
+import httpx
+import json
+import os
 import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import faiss
+    import numpy as np
+except ImportError:
+    faiss = None
+
+# upper bound on in-flight LLM requests for batch polishing
+MAX_CONCURRENT_REQUESTS = 32
+LLM_TIMEOUT_S = 30
+# shared by the sync client and every per-loop async client
+_CLIENT_KWARGS = dict(
+    timeout=LLM_TIMEOUT_S,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+)
+# created once at import so every call reuses the same connection pool
+_CLIENT = ollama.Client(**_CLIENT_KWARGS)
+
+# exponential backoff (1s, 2s, 4s, 8s) on transient failures only
+RETRY_ATTEMPTS = 5
+RETRY_MAX_DELAY_S = 16
+_RETRY_DELAYS = [min(RETRY_MAX_DELAY_S, 2 ** i) for i in range(RETRY_ATTEMPTS - 1)]
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# polished-bullet cache: exact match on the normalised bullet, then nearest
+# neighbour over bullet embeddings (needs faiss and an Ollama embedding model)
+EXACT_CACHE_SIZE = 4096
+SEMANTIC_CACHE_THRESHOLD = 0.95
+EMBED_MODEL = "nomic-embed-text"
+# optional path; the semantic index is loaded from / saved to it
+SEMANTIC_CACHE_PATH = os.environ.get("RESUME_POLISH_CACHE")
+
+_QUOTE_DEL = str.maketrans("", "", "\"'")
+_WS_RE = re.compile(r"\s+")
 
 st.set_page_config(page_title="Resume Bullet Polisher (Local LLM)", page_icon="📝", layout="wide")
 st.title("Resume Bullet Point Polisher using Local LLM (Ollama)")
 
 st.markdown("Rewrite resume bullet points to be more professional, achievement-oriented, and powerful—locally using Ollama.")
 
-def build_system_prompt():
-    return """
-You are a Career Coach and an expert Resume Writer.
-
-Your task is to take a bullet point from a user's resume and rewrite it to be 
-more professional, powerful, and achievement-oriented.
-
-Rules:
-1. Start the sentence with a strong Action Verb in past tense 
-   (e.g., Developed, Led, Implemented).
-2. Apply STAR or PAR structure when possible.
-3. Preserve original meaning — do NOT add new information.
-4. Keep it concise.
-5. Return ONLY the polished sentence, with no explanation.
-
-Training Examples:
-Original: "I was in charge of customer support."
-Polished: "Provided technical support to over 50 customers daily, resolving 95% of inquiries during first contact."
-
-Original: "I made some social media posts."
-Polished: "Managed the company's social media accounts, increasing audience engagement by 15% over 3 months."
+SYSTEM_PROMPT = """You are an expert resume writer. Rewrite the user's resume bullet point to be professional and achievement-oriented.
+Rules: start with a strong past-tense action verb; use STAR/PAR structure when possible; keep the original meaning and add no new information; be concise; return ONLY the polished sentence.
+Example:
+Original: I made some social media posts.
+Polished: Managed the company's social media accounts, increasing audience engagement by 15% over 3 months.
 """
 
+# local model used for polishing; stop at the first blank line so the model
+# cannot run on past the single polished sentence
+DEFAULT_MODEL = "mistral"
+GEN_OPTIONS = {"stop": ["\n\n"], "num_predict": 100}
+
+def build_system_prompt():
+    # the prompt is invariant, so it is built once at import
+    return SYSTEM_PROMPT
+
 def extract_polished_text(raw_output):
     """
     Remove quotes, markdown, and extra whitespace.
     """
-    cleaned = raw_output.strip()
-    cleaned = cleaned.replace('"', '').replace("'", "")
-    cleaned = re.sub(r'\s+', ' ', cleaned)
-    return cleaned.strip()
+    return _WS_RE.sub(" ", raw_output.translate(_QUOTE_DEL)).strip()
 
-def polish_with_ollama(bullet_point):
-    system_prompt = build_system_prompt()
+# The system message is the same object on every call, so the model server
+# can reuse its cached prefix; only the user turn varies with the bullet.
+_SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
 
-    prompt = f"""
-[SYSTEM]
-{system_prompt}
+def build_messages(bullet_point):
+    return [_SYSTEM_MESSAGE, {"role": "user", "content": f"Original: {bullet_point}\nPolished:"}]
 
-[USER INPUT]
-Original: {bullet_point}
-Polished:
-"""
+def _is_transient(exc):
+    """
+    Connection drops, timeouts, rate limits and 5xx are worth retrying;
+    anything else (e.g. a bad request or unknown model) fails fast.
+    ollama raises ConnectionError itself when the server is down or restarting.
+    """
+    if isinstance(exc, (ConnectionError, httpx.TransportError)):
+        return True
+    return isinstance(exc, ollama.ResponseError) and exc.status_code in _RETRY_STATUS
+
+def _chat_with_retry(**kwargs):
+    for delay in _RETRY_DELAYS:
+        try:
+            return _CLIENT.chat(**kwargs)
+        except Exception as e:
+            if not _is_transient(e):
+                raise
+        time.sleep(delay)
+    return _CLIENT.chat(**kwargs)
+
+async def _achat_with_retry(**kwargs):
+    for delay in _RETRY_DELAYS:
+        try:
+            return await (await _get_async_client()).chat(**kwargs)
+        except Exception as e:
+            if not _is_transient(e):
+                raise
+        await asyncio.sleep(delay)
+    return await (await _get_async_client()).chat(**kwargs)
+
+def polish_with_ollama_stream(bullet_point, model=DEFAULT_MODEL):
+    """
+    Yield the raw LLM output chunk by chunk, for rendering with st.write_stream.
+    """
+    stream = _CLIENT.chat(
+        model=model,
+        messages=build_messages(bullet_point),
+        options=GEN_OPTIONS,
+        stream=True,
+    )
+    for chunk in stream:
+        yield chunk["message"]["content"]
+
+# One AsyncClient per event loop: its connection pool is reused across calls
+# but cannot be shared between loops. Async callers only; synchronous code
+# goes through the pooled _CLIENT instead of starting a loop per call.
+_ASYNC_CLIENTS = weakref.WeakKeyDictionary()
+
+async def _close_on_loop_shutdown(client):
+    # loop.shutdown_asyncgens() (run by asyncio.run on exit) finalises this
+    # generator while the loop is still running, which closes the client
+    try:
+        yield
+    finally:
+        await client.close()
+
+async def _get_async_client():
+    loop = asyncio.get_running_loop()
+    entry = _ASYNC_CLIENTS.get(loop)
+    if entry is None:
+        client = ollama.AsyncClient(**_CLIENT_KWARGS)
+        closer = _close_on_loop_shutdown(client)
+        await closer.asend(None)
+        # the entry keeps the generator alive until the loop shuts down
+        entry = _ASYNC_CLIENTS[loop] = (client, closer)
+    return entry[0]
+
+@st.cache_resource
+def _bullet_cache():
+    # one exact-match cache (and its lock, for the sync batch path's worker
+    # threads) for the process: under Streamlit the script and its globals
+    # re-run on every interaction, but resources survive
+    return OrderedDict(), threading.Lock()
+
+_exact_cache, _cache_lock = _bullet_cache()
+_sem_index = None    # faiss.IndexFlatIP over L2-normalised bullet embeddings
+_sem_values = []     # (model, polished) per index row
+_sem_enabled = faiss is not None
+
+def _normalize_bullet(sentence):
+    return _WS_RE.sub(" ", sentence.lower()).strip()
+
+def _exact_get(key):
+    with _cache_lock:
+        hit = _exact_cache.get(key)
+        if hit is not None:
+            _exact_cache.move_to_end(key)
+        return hit
+
+def _exact_put(key, polished):
+    with _cache_lock:
+        _exact_cache[key] = polished
+        _exact_cache.move_to_end(key)
+        if len(_exact_cache) > EXACT_CACHE_SIZE:
+            _exact_cache.popitem(last=False)
+
+def _embedding_vector(response):
+    vec = np.asarray(response["embeddings"], dtype=np.float32).reshape(1, -1)
+    faiss.normalize_L2(vec)
+    return vec
 
-    response = ollama.chat(
-        model="mistral",
-        messages=[{"role": "user", "content": prompt}]
+def _embed_failed(exc):
+    global _sem_enabled
+    # no embedding model pulled: fall back to exact matching for good; any
+    # other failure (e.g. the server restarting) only skips this lookup
+    if isinstance(exc, ollama.ResponseError) and exc.status_code == 404:
+        _sem_enabled = False
+
+async def _embed(text):
+    if not _sem_enabled:
+        return None
+    try:
+        response = await (await _get_async_client()).embed(model=EMBED_MODEL, input=text)
+    except Exception as e:
+        _embed_failed(e)
+        return None
+    return _embedding_vector(response)
+
+def _embed_sync(text):
+    if not _sem_enabled:
+        return None
+    try:
+        response = _CLIENT.embed(model=EMBED_MODEL, input=text)
+    except Exception as e:
+        _embed_failed(e)
+        return None
+    return _embedding_vector(response)
+
+def _semantic_get(vec, model):
+    with _cache_lock:
+        if _sem_index is None or _sem_index.ntotal == 0 or _sem_index.d != vec.shape[1]:
+            return None
+        sims, ids = _sem_index.search(vec, 1)
+        if sims[0, 0] < SEMANTIC_CACHE_THRESHOLD:
+            return None
+        hit_model, polished = _sem_values[ids[0, 0]]
+    return polished if hit_model == model else None
+
+def _semantic_put(vec, model, polished):
+    global _sem_index
+    with _cache_lock:
+        if _sem_index is None:
+            _sem_index = faiss.IndexFlatIP(vec.shape[1])
+        elif _sem_index.d != vec.shape[1]:
+            return
+        _sem_index.add(vec)
+        _sem_values.append((model, polished))
+
+def _cache_lookup(key, vec):
+    polished = _exact_get(key)
+    if polished is None and vec is not None:
+        polished = _semantic_get(vec, key[0])
+        if polished is not None:
+            _exact_put(key, polished)
+    return polished
+
+def _cache_store(key, vec, polished):
+    _exact_put(key, polished)
+    if vec is not None:
+        _semantic_put(vec, key[0], polished)
+
+def save_semantic_cache(path):
+    if _sem_index is None:
+        return
+    faiss.write_index(_sem_index, path)
+    with open(path + ".json", "w", encoding="utf-8") as f:
+        json.dump(_sem_values, f)
+
+def load_semantic_cache(path):
+    global _sem_index, _sem_values
+    if faiss is None or not (os.path.exists(path) and os.path.exists(path + ".json")):
+        return
+    _sem_index = faiss.read_index(path)
+    with open(path + ".json", encoding="utf-8") as f:
+        _sem_values = [tuple(v) for v in json.load(f)]
+
+if SEMANTIC_CACHE_PATH and faiss is not None:
+    load_semantic_cache(SEMANTIC_CACHE_PATH)
+    atexit.register(save_semantic_cache, SEMANTIC_CACHE_PATH)
+
+async def polish_resume_sentence_v2_async(sentence, model=DEFAULT_MODEL):
+    key = (model, _normalize_bullet(sentence))
+    polished = _exact_get(key)
+    if polished is not None:
+        return polished
+
+    vec = await _embed(key[1])
+    polished = _cache_lookup(key, vec)
+    if polished is not None:
+        return polished
+
+    response = await _achat_with_retry(
+        model=model,
+        messages=build_messages(sentence),
+        options=GEN_OPTIONS,
+    )
+    polished = extract_polished_text(response["message"]["content"])
+    _cache_store(key, vec, polished)
+    return polished
+
+async def polish_resume_sentences_batch(sentences, model=DEFAULT_MODEL, max_concurrent=MAX_CONCURRENT_REQUESTS):
+    """
+    Polish many bullets concurrently; results keep the input order.
+    """
+    sem = asyncio.Semaphore(max_concurrent)
+
+    async def bounded(sentence):
+        async with sem:
+            return await polish_resume_sentence_v2_async(sentence, model)
+
+    return await asyncio.gather(*(bounded(s) for s in sentences))
+
+def polish_resume_sentence_v2(sentence, model=DEFAULT_MODEL):
+    """
+    Blocking variant for synchronous callers, on the pooled sync client.
+    Safe to call from code that already runs an event loop.
+    """
+    key = (model, _normalize_bullet(sentence))
+    polished = _exact_get(key)
+    if polished is not None:
+        return polished
+
+    vec = _embed_sync(key[1])
+    polished = _cache_lookup(key, vec)
+    if polished is not None:
+        return polished
+
+    response = _chat_with_retry(
+        model=model,
+        messages=build_messages(sentence),
+        options=GEN_OPTIONS,
     )
-    
-    raw = response["message"]["content"]
-    return extract_polished_text(raw)
+    polished = extract_polished_text(response["message"]["content"])
+    _cache_store(key, vec, polished)
+    return polished
+
+def polish_resume_sentences(sentences, model=DEFAULT_MODEL, max_concurrent=MAX_CONCURRENT_REQUESTS):
+    """
+    Blocking batch variant: worker threads share the pooled sync client.
+    Results keep the input order.
+    """
+    sentences = list(sentences)
+    if not sentences:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_concurrent, len(sentences))) as pool:
+        return list(pool.map(lambda s: polish_resume_sentence_v2(s, model), sentences))
 
 st.subheader("Enter a resume bullet point")
 
@@ -73,11 +341,16 @@ if st.button("Polish Bullet Point"):
     if not user_input.strip():
         st.error("Please enter a bullet point first.")
     else:
-        with st.spinner("Polishing using local LLM… ✨"):
-            polished = polish_with_ollama(user_input)
+        st.write("### Polished Bullet")
+        key = (DEFAULT_MODEL, _normalize_bullet(user_input))
+        polished = _exact_get(key)
+        if polished is None:
+            # tokens render as they arrive; the cleaned text is shown once complete
+            raw = st.write_stream(polish_with_ollama_stream(user_input))
+            polished = extract_polished_text(raw if isinstance(raw, str) else "".join(map(str, raw)))
+            _exact_put(key, polished)
 
         st.success("Polished Successfully!")
-        st.write("### Polished Bullet")
         st.code(polished, language="markdown")
 
         st.download_button(
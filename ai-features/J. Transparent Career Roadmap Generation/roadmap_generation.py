@@ -6,19 +6,33 @@ builder. Now includes a small neural-network–style model to prioritize steps.
 Previously `transparent_career_roadmap_generation.py` at the root of `ai-features`.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel
 from fastapi import FastAPI
 import re
 import json
-import math
-import random
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    from scipy.special import expit
+except ImportError:
+    expit = None
 
 try:
     import spacy
-    nlp = spacy.load("en_core_web_sm")
-except Exception:
-    nlp = None
+except ImportError:
+    spacy = None
+
+# Always run spaCy NER after the rule-based pass (otherwise only when the
+# rules found few skills)
+USE_SPACY = False
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 app = FastAPI(title="Transparent Career Roadmap API")
 
@@ -121,31 +135,110 @@ SKILL_SYNONYMS = {
     "rest api": "REST APIs",
 }
 
+CANONICAL_SET = set(SKILL_SYNONYMS.values())
+
+# Single alternation over all synonyms, longest first so "rest api" wins over
+# "rest"; matches are mapped back to canonical names through SKILL_SYNONYMS.
+_SKILL_RE = re.compile(
+    r"\b("
+    + "|".join(re.escape(k) for k in sorted(SKILL_SYNONYMS, key=len, reverse=True))
+    + r")\b"
+)
+
+# Aho-Corasick automaton over the same vocabulary when pyahocorasick is
+# installed: one linear pass regardless of how many synonyms there are.
+_SKILL_AC = None
+if ahocorasick is not None:
+    _SKILL_AC = ahocorasick.Automaton()
+    for _k, _v in SKILL_SYNONYMS.items():
+        _SKILL_AC.add_word(_k, (len(_k), _v))
+    _SKILL_AC.make_automaton()
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+def _match_synonyms(text_low: str) -> set:
+    if _SKILL_AC is None:
+        return {SKILL_SYNONYMS[m] for m in _SKILL_RE.findall(text_low)}
+
+    found = set()
+    last = len(text_low) - 1
+    for end, (length, canonical) in _SKILL_AC.iter(text_low):
+        start = end - length + 1
+        # same word boundaries as the regex's \b
+        if start > 0 and _is_word_char(text_low[start - 1]):
+            continue
+        if end < last and _is_word_char(text_low[end + 1]):
+            continue
+        found.add(canonical)
+    return found
+
 
 # -------------------------------------------------------------------------
 # Simple skill extraction (rules + optional spaCy)
 # -------------------------------------------------------------------------
+@lru_cache(maxsize=1)
+def _get_nlp():
+    """Load the spaCy model on first use; only NER is needed."""
+    if spacy is None:
+        return None
+    try:
+        return spacy.load(
+            "en_core_web_sm",
+            disable=["tagger", "parser", "attribute_ruler", "lemmatizer"],
+        )
+    except Exception:
+        return None
+
+
+# NER is skipped once the rules already cover this many canonical skills
+_NER_MIN_FOUND = len(CANONICAL_SET) // 2
+
+
+def _needs_ner(found: set) -> bool:
+    return USE_SPACY or len(found) < _NER_MIN_FOUND
+
+
+def _add_ner_skills(doc, found: set) -> None:
+    for ent in doc.ents:
+        token = ent.text.lower().strip()
+        if token in SKILL_SYNONYMS:
+            found.add(SKILL_SYNONYMS[token])
+
+
 def simple_skill_extractor(text: str) -> List[str]:
     text_low = text.lower()
-    found = set()
-    for k in SKILL_SYNONYMS:
-        if re.search(r"\b" + re.escape(k) + r"\b", text_low):
-            found.add(SKILL_SYNONYMS[k])
+    found = _match_synonyms(text_low)
 
     # Optional AI: spaCy NER
-    if nlp:
-        doc = nlp(text)
-        for ent in doc.ents:
-            token = ent.text.lower().strip()
-            if token in SKILL_SYNONYMS:
-                found.add(SKILL_SYNONYMS[token])
+    if _needs_ner(found):
+        nlp = _get_nlp()
+        if nlp is not None:
+            _add_ner_skills(nlp(text), found)
 
     return sorted(found)
 
 
+def simple_skill_extractor_batch(texts: List[str], batch_size: int = 64) -> List[List[str]]:
+    """simple_skill_extractor over many texts, running NER through nlp.pipe."""
+    founds = [_match_synonyms(t.lower()) for t in texts]
+    todo = [i for i, f in enumerate(founds) if _needs_ner(f)]
+    nlp = _get_nlp() if todo else None
+    if nlp is not None:
+        docs = nlp.pipe((texts[i] for i in todo), batch_size=batch_size)
+        for i, doc in zip(todo, docs):
+            _add_ner_skills(doc, founds[i])
+    return [sorted(f) for f in founds]
+
+
 def normalize_skills(skills: List[str]) -> List[str]:
     normalized = []
     for s in skills:
+        if s in CANONICAL_SET:
+            normalized.append(s)
+            continue
         key = s.lower()
         normalized.append(SKILL_SYNONYMS.get(key, s))
     # dedupe preserving order
@@ -166,35 +259,79 @@ def gap_analysis(detected: List[str], role_req: Dict[str, Any]) -> List[Dict[str
     return sorted(gaps, key=lambda x: -x["importance"])
 
 
-def resolve_prereqs(skill: str, role_req: Dict[str, Any]) -> List[str]:
+def resolve_prereqs(
+    skill: str,
+    role_req: Dict[str, Any],
+    memo: Optional[Dict[str, List[str]]] = None,
+) -> List[str]:
+    """
+    All prerequisites of `skill` in dependency (DFS post-) order, excluding
+    the skill itself. Pass the same `memo` dict across calls to reuse the
+    orders already computed for shared prerequisites.
+    """
     skills_meta = role_req.get("skills", {})
-    visited = set()
-    order: List[str] = []
+    if memo is None:
+        memo = {}
+
+    # Iterative post-order walk with an explicit stack (no recursion limit on
+    # deep graphs): a skill is finalised once all its prereqs are in memo.
+    # Only ancestors are ever on the stack, so on_stack doubles as cycle guard.
+    stack = [skill]
+    on_stack = {skill}
+    while stack:
+        s = stack[-1]
+        if s in memo:
+            stack.pop()
+            continue
+        prereqs = skills_meta.get(s, {}).get("prereq", [])
+        pending = next((p for p in prereqs if p not in memo and p not in on_stack), None)
+        if pending is not None:
+            stack.append(pending)
+            on_stack.add(pending)
+            continue
+        order: Dict[str, None] = {}
+        for p in prereqs:
+            order.update(dict.fromkeys(memo.get(p, ())))  # absent only on a cycle
+            order[p] = None
+        memo[s] = [v for v in order if v != s]
+        stack.pop()
+        on_stack.discard(s)
+
+    return memo[skill]
+
+
+def _precompute_role_topo(role_req: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Prerequisite order of every skill of a role, resolved once per distinct
+    prerequisite structure; roadmap requests then only do dict lookups.
+    Keyed on the structure itself, so editing a role's prereqs is picked up.
+    """
+    signature = tuple(
+        (skill, tuple(meta.get("prereq", ())))
+        for skill, meta in role_req.get("skills", {}).items()
+    )
+    return _role_topo(signature)
 
-    def dfs(s):
-        if s in visited:
-            return
-        visited.add(s)
-        meta = skills_meta.get(s, {})
-        for p in meta.get("prereq", []):
-            dfs(p)
-        order.append(s)
 
-    dfs(skill)
-    # return all prerequisites in dependency order (excluding the final skill itself)
-    order = [v for v in order if v != skill]
-    return order
+@lru_cache(maxsize=64)
+def _role_topo(signature: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> Dict[str, List[str]]:
+    role_req = {"skills": {skill: {"prereq": list(prereqs)} for skill, prereqs in signature}}
+    topo: Dict[str, List[str]] = {}
+    for skill, _ in signature:
+        resolve_prereqs(skill, role_req, topo)
+    return topo
 
 
 # -------------------------------------------------------------------------
 # Tiny AI model: neural-net style roadmap step prioritizer
 # -------------------------------------------------------------------------
-def sigmoid(x: float) -> float:
-    return 1.0 / (1.0 + math.exp(-x))
+def _np_sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
 
 
-def tanh(x: float) -> float:
-    return math.tanh(x)
+# Vectorised activations; expit is overflow-safe for large |x|
+sigmoid = expit if expit is not None else _np_sigmoid
+tanh = np.tanh
 
 
 class TinyRoadmapModel:
@@ -211,26 +348,22 @@ class TinyRoadmapModel:
         self.input_dim = input_dim
         self.hidden_dim = hidden_dim
 
-        random.seed(123)  # reproducible "trained" weights
-
-        # Initialize small random weights
-        self.W1 = [
-            [(random.random() - 0.5) * 0.6 for _ in range(input_dim)]
-            for _ in range(hidden_dim)
-        ]
-        self.b1 = [(random.random() - 0.5) * 0.6 for _ in range(hidden_dim)]
+        # reproducible "trained" weights, independent of the global random state
+        rng = np.random.default_rng(123)
 
-        self.W2 = [(random.random() - 0.5) * 0.6 for _ in range(hidden_dim)]
-        self.b2 = (random.random() - 0.5) * 0.6
+        # Initialize small random weights in [-0.3, 0.3), stored as float32
+        # (twice the SIMD lanes of float64; int8 would not pay off at this size)
+        self.W1 = rng.uniform(-0.3, 0.3, size=(hidden_dim, input_dim)).astype(np.float32)
+        self.b1 = rng.uniform(-0.3, 0.3, size=hidden_dim).astype(np.float32)
+        self.W2 = rng.uniform(-0.3, 0.3, size=hidden_dim).astype(np.float32)
+        self.b2 = np.float32(rng.uniform(-0.3, 0.3))
 
         # Nudge certain feature columns to be more influential:
         #   - importance (idx 0)
         #   - is_prereq (idx 1)
         #   - depth_norm (idx 2)
         important_indices = [0, 1, 2]
-        for h in range(hidden_dim):
-            for idx in important_indices:
-                self.W1[h][idx] *= 1.8
+        self.W1[:, important_indices] *= np.float32(1.8)
 
     def predict_score(self, features: List[float]) -> float:
         """
@@ -241,21 +374,15 @@ class TinyRoadmapModel:
             raise ValueError(
                 f"Expected {self.input_dim} features, got {len(features)}"
             )
+        return float(self.predict_batch(np.asarray([features], dtype=np.float32))[0])
 
-        # Hidden layer
-        hidden: List[float] = []
-        for h in range(self.hidden_dim):
-            z = self.b1[h]
-            for i, x in enumerate(features):
-                z += self.W1[h][i] * x
-            hidden.append(tanh(z))
-
-        # Output
-        z_out = self.b2
-        for h in range(self.hidden_dim):
-            z_out += self.W2[h] * hidden[h]
-
-        return sigmoid(z_out)
+    def predict_batch(self, F: np.ndarray) -> np.ndarray:
+        """
+        Batched forward pass over an (N, input_dim) feature matrix.
+        Returns an (N,) array of priority scores in [0, 1].
+        """
+        hidden = tanh(F @ self.W1.T + self.b1)
+        return sigmoid(hidden @ self.W2 + self.b2)
 
 
 ROADMAP_MODEL = TinyRoadmapModel(input_dim=5, hidden_dim=6)
@@ -312,13 +439,15 @@ def schedule_steps(
 
     candidates: List[Dict[str, Any]] = []
     seen: set = set()
+    # shared per prerequisite structure; see _precompute_role_topo
+    prereq_memo = _precompute_role_topo(role_req)
 
     for gap in gaps:
         skill = gap["skill"]
         importance = float(gap.get("importance", 0.0))
 
         # First, handle prerequisites
-        prereqs = resolve_prereqs(skill, role_req)
+        prereqs = resolve_prereqs(skill, role_req, prereq_memo)
         for depth, p in enumerate(prereqs, start=1):
             if p in detected or p in seen:
                 continue
@@ -355,19 +484,22 @@ def schedule_steps(
             )
             seen.add(skill)
 
-    # AI: score and sort candidates
+    # AI: score all candidates in one batched pass, then sort
+    F = np.array(
+        [build_step_features(c, target_role) for c in candidates], dtype=np.float32
+    ).reshape(len(candidates), ROADMAP_MODEL.input_dim)
+    scores = ROADMAP_MODEL.predict_batch(F)
+
+    # ties keep insertion order (prerequisites before the skill they unlock),
+    # so the ordering is deterministic for identical inputs
     scored: List[tuple] = []
-    for c in candidates:
-        features = build_step_features(c, target_role)
-        score = ROADMAP_MODEL.predict_score(features)
-        # tiny jitter for tie-breaking
-        score += random.random() * 0.01
-        scored.append((score, c))
+    for i, (score, c) in enumerate(zip(scores.tolist(), candidates)):
+        scored.append((-score, i, c))
 
-    scored.sort(key=lambda x: x[0], reverse=True)
+    scored.sort(key=lambda x: x[:2])
 
     roadmap: List[RoadmapStep] = []
-    for score, c in scored:
+    for _, _, c in scored:
         roadmap.append(
             RoadmapStep(
                 step=c["name"],
@@ -403,13 +535,45 @@ def generate_narrative(
     )
 
 
+ROADMAP_CACHE_SIZE = 1024
+
+
 def build_roadmap_logic(
     resume_text: str,
     target_role: str,
     timeline_months: Optional[int] = None,
 ) -> RoadmapOutput:
-    detected = simple_skill_extractor(resume_text)
-    normalized = normalize_skills(detected)
+    """Roadmaps are deterministic, so repeated requests are served from a
+    cache; callers get their own copy to mutate. The key covers the role's
+    entry in KNOWLEDGE_GRAPH and USE_SPACY, so editing either is picked up;
+    after changing other module data (e.g. SKILL_SYNONYMS) call
+    `build_roadmap_logic.cache_clear()`. `timeline_months` does not affect
+    the roadmap yet."""
+    role_sig = _role_signature(KNOWLEDGE_GRAPH.get(target_role))
+    return _build_roadmap_cached(resume_text, target_role, role_sig, USE_SPACY).model_copy(deep=True)
+
+
+def _role_signature(role_req: Optional[Dict[str, Any]]) -> Optional[tuple]:
+    """Hashable snapshot of everything a roadmap reads from a role."""
+    if role_req is None:
+        return None
+    skills = tuple(
+        (skill, meta.get("importance", 0.0), tuple(meta.get("prereq", ())))
+        for skill, meta in role_req.get("skills", {}).items()
+    )
+    return skills, tuple(role_req.get("resources", {}).items())
+
+
+@lru_cache(maxsize=ROADMAP_CACHE_SIZE)
+def _build_roadmap_cached(
+    resume_text: str,
+    target_role: str,
+    role_sig: Optional[tuple],
+    use_spacy: bool,
+) -> RoadmapOutput:
+    # role_sig and use_spacy only key the cache; the body reads the globals
+    # simple_skill_extractor already returns sorted, unique canonical names
+    normalized = simple_skill_extractor(resume_text)
 
     role_req = get_role_requirements(target_role)
     if not role_req:
@@ -434,6 +598,9 @@ def build_roadmap_logic(
     )
 
 
+build_roadmap_logic.cache_clear = _build_roadmap_cached.cache_clear
+
+
 # -------------------------------------------------------------------------
 # FastAPI endpoint
 # -------------------------------------------------------------------------
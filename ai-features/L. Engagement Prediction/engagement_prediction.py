@@ -20,6 +20,9 @@ except Exception:  # pragma: no cover - environment may not have ML deps
     pd = None
     LogisticRegression = None
 
+# Model input columns, in the order the model is trained on.
+FEATURES = ('time_on_quest', 'errors_in_session', 'quest_difficulty', 'prev_completion_rate')
+
 
 def generate_synthetic_engagement_data(num_samples: int = 500, seed: int = 42):
     """Create a simple synthetic dataset matching the original notebook."""
@@ -54,15 +57,16 @@ def train_engagement_model(df):
     if LogisticRegression is None:
         raise RuntimeError("sklearn is required to train the model")
 
-    features = ['time_on_quest', 'errors_in_session', 'quest_difficulty', 'prev_completion_rate']
     target = 'dropped_off'
 
-    X = df[features]
-    y = df[target]
+    # liblinear is the cheaper solver for a problem this small; float32 halves
+    # the feature matrix and matches what predict_dropoff feeds the model.
+    X = df[list(FEATURES)].to_numpy(dtype=np.float32)
+    y = df[target].to_numpy()
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-    model = LogisticRegression(max_iter=500)
+    model = LogisticRegression(solver='liblinear', max_iter=500)
     model.fit(X_train, y_train)
 
     y_pred = model.predict(X_test)
@@ -76,8 +80,8 @@ def predict_dropoff(model, user_data: Dict[str, Any]) -> float:
     The user_data dict should contain keys in the same order as the features
     created by generate_synthetic_engagement_data.
     """
-    features = ['time_on_quest', 'errors_in_session', 'quest_difficulty', 'prev_completion_rate']
-    arr = [[user_data.get(k) for k in features]]
+    row = [user_data.get(k) for k in FEATURES]
+    arr = np.asarray([row], dtype=np.float32) if np is not None else [row]
     if hasattr(model, 'predict_proba'):
         return float(model.predict_proba(arr)[0][1])
     # fallback (deterministic): use predict()
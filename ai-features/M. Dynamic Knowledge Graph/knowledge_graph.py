@@ -52,11 +52,38 @@ def build_sample_graph():
     G.add_edge('P1', 'Python', rel='requires')
     G.add_edge('P2', 'Python', rel='requires')
 
+    index_by_skill(G)
     return G
 
 
+def index_by_skill(G) -> None:
+    """Cache, per skill, the courses teaching it and the projects requiring it
+    in G.graph['by_skill'] (neighbour order preserved). Call again after
+    mutating the graph; the cache is not updated automatically."""
+    by_skill: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    for skill, attrs in G.nodes(data=True):
+        if attrs.get('type') != 'skill':
+            continue
+        entry = {'teaches': [], 'requires': []}
+        for nbr, edge in G.adj[skill].items():
+            nbr_type = G.nodes[nbr].get('type')
+            rel = edge.get('rel')
+            if (nbr_type, rel) in (('course', 'teaches'), ('project', 'requires')):
+                entry[rel].append({'id': nbr, 'name': G.nodes[nbr].get('name')})
+        by_skill[skill] = entry
+    G.graph['by_skill'] = by_skill
+
+
+def _cached(G, skill: str, rel: str):
+    entry = G.graph.get('by_skill', {}).get(skill)
+    return None if entry is None else [dict(d) for d in entry[rel]]
+
+
 def courses_teaching_skill(G, skill: str) -> List[Dict[str, Any]]:
     """Return list of course nodes that teach `skill` as dicts."""
+    cached = _cached(G, skill, 'teaches')
+    if cached is not None:
+        return cached
     out = []
     for nbr in G.neighbors(skill):
         if G.nodes[nbr].get('type') == 'course' and G.edges[skill, nbr].get('rel') == 'teaches':
@@ -65,6 +92,9 @@ def courses_teaching_skill(G, skill: str) -> List[Dict[str, Any]]:
 
 
 def projects_requiring_skill(G, skill: str) -> List[Dict[str, Any]]:
+    cached = _cached(G, skill, 'requires')
+    if cached is not None:
+        return cached
     out = []
     for nbr in G.neighbors(skill):
         if G.nodes[nbr].get('type') == 'project' and G.edges[nbr, skill].get('rel') == 'requires':
@@ -9,15 +9,40 @@ Notes:
   used without installing heavy dependencies (e.g., SBERT, OpenAI). Missing
   features return friendly results explaining what failed.
 """
+import copy
+import hashlib
+import json
+import os
+import shelve
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from functools import lru_cache
 from importlib.machinery import SourceFileLoader
 from types import ModuleType
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 
 ROOT = Path(__file__).resolve().parents[1]
 FEATURES_DIR = ROOT / "ai-features"
 
+# Loaded feature modules, shared by every orchestrator in the process so
+# repeated pipeline runs don't re-parse and re-compile the scripts.
+_MODULE_CACHE: Dict[str, ModuleType] = {}
+
+
+@lru_cache(maxsize=1)
+def _file_index() -> Dict[str, Path]:
+    """{basename: path} for every file under ai-features, built by one walk."""
+    index: Dict[str, Path] = {}
+    for dirpath, dirnames, filenames in os.walk(FEATURES_DIR):
+        dirnames.sort()
+        for fn in filenames:
+            index.setdefault(fn, Path(dirpath) / fn)
+    return index
+
 
 def _load_module(name: str, filename: str) -> ModuleType:
     """Load a Python file by a path relative to ai-features.
@@ -26,17 +51,57 @@ def _load_module(name: str, filename: str) -> ModuleType:
     helper accepts either a simple filename (legacy) or a relative path like
     "9. Explainable Scoring Engine/scoring_engine.py" and resolves it.
     """
+    if name in _MODULE_CACHE:
+        return _MODULE_CACHE[name]
+    path = _resolve_feature(filename)
+    module = _MODULE_CACHE[name] = SourceFileLoader(name, str(path)).load_module()
+    return module
+
+
+def _resolve_feature(filename: str) -> Path:
     # Try direct path first
     path = FEATURES_DIR / filename
     if not path.exists():
-        # Try to locate the file recursively by name
-        target_name = Path(filename).name
-        found = list(FEATURES_DIR.rglob(target_name))
-        if not found:
+        # Fall back to locating the file by name
+        found = _file_index().get(Path(filename).name)
+        if found is None:
             raise FileNotFoundError(f"Feature file not found (tried {filename}): {path}")
-        # pick first match
-        path = found[0]
-    return SourceFileLoader(name, str(path)).load_module()
+        path = found
+    return path
+
+
+@lru_cache(maxsize=None)
+def _feature_version(filename: str) -> str:
+    """Digest of a feature script's source. The catalogs live in the scripts,
+    so editing code or data changes the memo keys of results built from it."""
+    try:
+        data = _resolve_feature(filename).read_bytes()
+    except FileNotFoundError:
+        return "missing"
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+# Results kept in memory per orchestrator (LRU); a shelve file can back it
+RESULT_CACHE_SIZE = 256
+# entries older than this are recomputed
+RESULT_TTL_S = 7 * 24 * 3600
+# bump when the shape of memoised results changes on the orchestrator side
+RESULT_CACHE_VERSION = 1
+
+# feature scripts behind the memoised methods
+SCORING_FEATURE = "9. Explainable Scoring Engine/scoring_engine.py"
+ROADMAP_FEATURE = "11. Transparent Career Roadmap Generation/roadmap_generation.py"
+
+# Strength-score section weights passed to the scoring engine
+SCORE_WEIGHTS = {"Edu": 0.2, "Exp": 0.25, "Proj": 0.2, "Skills": 0.25, "Cert": 0.1}
+
+
+def _fingerprint(method: str, args: tuple, version: str = "") -> str:
+    """Content hash of a call: identical inputs give the same key regardless
+    of dict ordering. `version` salts the key so upgrades miss old entries."""
+    payload = json.dumps(args, sort_keys=True, ensure_ascii=False, default=str)
+    salt = f"{RESULT_CACHE_VERSION}:{version}"
+    return hashlib.blake2b(f"{salt}\0{method}\0{payload}".encode("utf-8"), digest_size=16).hexdigest()
 
 
 class CareerMatchOrchestrator:
@@ -46,9 +111,72 @@ class CareerMatchOrchestrator:
     JSON-serializable outputs where possible.
     """
 
-    def __init__(self):
+    def __init__(self, cache_path: Optional[str] = None):
         # Lazy-load modules only when a method is invoked.
         self._modules: Dict[str, ModuleType] = {}
+        # Memoised (timestamp, result) of score_cv / build_roadmap by input
+        # fingerprint; `cache_path` also persists them across runs.
+        self._results: "OrderedDict[str, Any]" = OrderedDict()
+        self._disk = None
+        if cache_path:
+            Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+            self._disk = shelve.open(str(cache_path))
+        self._results_lock = threading.Lock()
+        # infer_essential_skills results per (module name, job title)
+        self._essentials_cache: Dict[tuple, list] = {}
+        # engagement model trained on first assess_engagement call (seeded data)
+        self._engagement_model = None
+        self._engagement_acc = None
+
+    def _memo(self, method: str, args: tuple, fn, feature: str) -> Dict[str, Any]:
+        """Return fn(*args), memoised by the inputs and the source of `feature`,
+        the script fn runs. Only for deterministic methods."""
+        key = _fingerprint(method, args, _feature_version(feature))
+        with self._results_lock:
+            hit = self._results.get(key)
+            if hit is None and self._disk is not None:
+                hit = self._disk.get(key)
+            if hit is not None and time.time() - hit[0] >= RESULT_TTL_S:
+                # expired: drop it from both tiers so the shelf doesn't only grow
+                self._results.pop(key, None)
+                if self._disk is not None and key in self._disk:
+                    del self._disk[key]
+                hit = None
+            if hit is not None:
+                self._results[key] = hit
+                self._results.move_to_end(key)
+                if len(self._results) > RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+                return copy.deepcopy(hit[1])
+        out = fn(*args)
+        # failures are not cached so a fixed environment is picked up
+        if isinstance(out, dict) and "error" not in out:
+            stored = (time.time(), copy.deepcopy(out))
+            with self._results_lock:
+                self._results[key] = stored
+                if len(self._results) > RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+                if self._disk is not None:
+                    self._disk[key] = stored
+        return out
+
+    def _essentials(self, mod_name: str, mod: ModuleType, job_title: str) -> list:
+        """Essential skills inferred by `mod` for `job_title`, computed once per pair."""
+        key = (mod_name, job_title)
+        if key not in self._essentials_cache:
+            essentials = []
+            if hasattr(mod, "infer_essential_skills"):
+                try:
+                    essentials = list(mod.infer_essential_skills(job_title))
+                except Exception:
+                    essentials = []
+            self._essentials_cache[key] = essentials
+        return list(self._essentials_cache[key])
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
 
     def _module(self, name: str, filename: str) -> ModuleType:
         key = name
@@ -59,29 +187,49 @@ class CareerMatchOrchestrator:
     # --- Scoring / Explanation ---
     def score_cv(self, cv_obj: Dict[str, Any], job_title: str) -> Dict[str, Any]:
         """Runs the explainable scoring engine and returns scores + explanation."""
-        mod = self._module("explainable_scoring_engine", "9. Explainable Scoring Engine/scoring_engine.py")
+        return self._memo("score_cv", (cv_obj, job_title), self._score_cv, SCORING_FEATURE)
+
+    def _score_cv(self, cv_obj: Dict[str, Any], job_title: str) -> Dict[str, Any]:
+        mod = self._module("explainable_scoring_engine", SCORING_FEATURE)
         # infer essential skills if module exposes helper
-        essentials = []
-        if hasattr(mod, "infer_essential_skills"):
-            try:
-                essentials = mod.infer_essential_skills(job_title)
-            except Exception:
-                essentials = []
+        essentials = self._essentials("explainable_scoring_engine", mod, job_title)
 
         try:
-            C = mod.completeness_score(cv_obj, essentials)
-            R = mod.relevance_score(cv_obj, job_title)
-            S_detail = mod.strength_score(cv_obj, essentials, {"Edu": 0.2, "Exp": 0.25, "Proj": 0.2, "Skills": 0.25, "Cert": 0.1})
-            scores = {"Strength_S": round(S_detail["S"], 2), "Relevance_R": round(R, 2), "Completeness_C": round(C, 2)}
-            subs = {"Education": round(S_detail["Edu"], 2), "Experience": round(S_detail["Exp"], 2), "Projects": round(S_detail["Proj"], 2), "Skills": round(S_detail["Skills"], 2), "Certifications": round(S_detail["Cert"], 2)}
-            explanation = mod.make_explanation(scores, subs, cv_obj, essentials, job_title)
-            return {"scores": scores, "subscores": subs, "explanation": explanation}
+            res = mod.score_cv(cv_obj, essentials, job_title, SCORE_WEIGHTS)
+            return self._format_score(mod, res, cv_obj, essentials, job_title)
         except Exception as e:
             return {"error": "scoring_failed", "message": str(e)}
 
+    def score_cv_batch(self, cvs: List[Dict[str, Any]], job_title: str) -> List[Dict[str, Any]]:
+        """score_cv for many CVs against one role; essentials are inferred and the
+        role text analysed once. Results line up with `cvs`."""
+        mod = self._module("explainable_scoring_engine", SCORING_FEATURE)
+        essentials = self._essentials("explainable_scoring_engine", mod, job_title)
+
+        try:
+            if hasattr(mod, "score_cv_batch"):
+                results = mod.score_cv_batch(cvs, essentials, job_title, SCORE_WEIGHTS)
+            else:
+                results = [mod.score_cv(cv_obj, essentials, job_title, SCORE_WEIGHTS) for cv_obj in cvs]
+            return [self._format_score(mod, res, cv_obj, essentials, job_title) for cv_obj, res in zip(cvs, results)]
+        except Exception:
+            # fall back per CV so one bad CV only fails its own entry
+            return [self._score_cv(cv_obj, job_title) for cv_obj in cvs]
+
+    @staticmethod
+    def _format_score(mod: ModuleType, res: Dict[str, Any], cv_obj: Dict[str, Any], essentials: list, job_title: str) -> Dict[str, Any]:
+        C, R, S_detail = res["C"], res["R"], res["S"]
+        scores = {"Strength_S": round(S_detail["S"], 2), "Relevance_R": round(R, 2), "Completeness_C": round(C, 2)}
+        subs = {"Education": round(S_detail["Edu"], 2), "Experience": round(S_detail["Exp"], 2), "Projects": round(S_detail["Proj"], 2), "Skills": round(S_detail["Skills"], 2), "Certifications": round(S_detail["Cert"], 2)}
+        explanation = mod.make_explanation(scores, subs, cv_obj, essentials, job_title, missing=res["missing"])
+        return {"scores": scores, "subscores": subs, "explanation": explanation}
+
     # --- Roadmap ---
     def build_roadmap(self, resume_text: str, target_role: str, timeline_months: Optional[int] = None) -> Dict[str, Any]:
-        mod = self._module("transparent_career_roadmap", "11. Transparent Career Roadmap Generation/roadmap_generation.py")
+        return self._memo("build_roadmap", (resume_text, target_role, timeline_months), self._build_roadmap, ROADMAP_FEATURE)
+
+    def _build_roadmap(self, resume_text: str, target_role: str, timeline_months: Optional[int] = None) -> Dict[str, Any]:
+        mod = self._module("transparent_career_roadmap", ROADMAP_FEATURE)
         try:
             ro = mod.build_roadmap_logic(resume_text, target_role, timeline_months)
             # model_dump or dict-like
@@ -99,12 +247,7 @@ class CareerMatchOrchestrator:
     def recommend_micro_projects(self, cv_obj: Dict[str, Any], job_title: str, k_per_skill: int = 3) -> Dict[str, Any]:
         mod = self._module("micro_project_recommender", "6. Micro Project Recommender/micro_project_recommender.py")
         # infer essential skills
-        essentials = []
-        if hasattr(mod, "infer_essential_skills"):
-            try:
-                essentials = mod.infer_essential_skills(job_title)
-            except Exception:
-                essentials = []
+        essentials = self._essentials("micro_project_recommender", mod, job_title)
         # default: require cv_obj
         try:
             recs = mod.recommend_projects(cv_obj, essentials, mod.proj_df, k_per_skill, role_hint=job_title)
@@ -116,14 +259,15 @@ class CareerMatchOrchestrator:
 
     # --- Adaptive recommendation (skill tree + content db) ---
     def adaptive_recommend(self, cv_features: Dict[str, Any], target_role: str, top_k: int = 3) -> Dict[str, Any]:
+        # not memoised: recommendations carry random jitter on every call
         mod = self._module("adaptive_recommendation_system", "2. Adaptive Recommendation System/adaptive_recommendation.py")
         try:
             user_state = mod.build_user_state_from_cv(cv_features)
             mod.update_statuses(user_state)
-            recs = mod.get_adaptive_recommendations(user_state, target_role, top_k=top_k)
+            recs = mod.get_ai_recommendations(user_state, target_role, top_k=top_k)
             # convert dataclass objects to dicts
-            out = [vars(r) for r in recs]
-            status = {k: vars(v) for k, v in user_state.items()}
+            out = [asdict(r) for r in recs]
+            status = {k: asdict(v) for k, v in user_state.items()}
             return {"user_state": status, "recommendations": out}
         except Exception as e:
             return {"error": "adaptive_failed", "message": str(e)}
@@ -139,19 +283,32 @@ class CareerMatchOrchestrator:
         except Exception as e:
             return {"error": "polish_failed", "message": str(e)}
 
+    def polish_resume_sentences(self, sentences: List[str]) -> Dict[str, Any]:
+        """Polish a whole resume at once; requests run concurrently, not one by one."""
+        mod = self._module("resume_polish", "10. Resume Polishing Suggestions/resume_polish.py")
+        try:
+            if not hasattr(mod, "polish_resume_sentences"):
+                return {"error": "not_supported", "message": "batch polish function not available in module"}
+            polished = mod.polish_resume_sentences(sentences)
+            return {"results": [{"original": s, "polished": p} for s, p in zip(sentences, polished)]}
+        except Exception as e:
+            return {"error": "polish_failed", "message": str(e)}
+
     # --- Engagement prediction (Feature 20) ---
     def assess_engagement(self, user_data: Dict[str, Any], threshold: float = 0.7) -> Dict[str, Any]:
         """Train a small synthetic model (from feature 20) and assess the provided user session.
 
         This is intentionally lightweight and trains on synthetic data so it doesn't
-        require any external datasets.
+        require any external datasets. The model is trained once per orchestrator
+        (the synthetic data is seeded) and reused for later assessments.
         """
         mod = self._module("engagement_prediction", "20. Engagement Prediction/engagement_prediction.py")
         try:
-            df = mod.generate_synthetic_engagement_data(num_samples=300)
-            model, acc = mod.train_engagement_model(df)
-            out = mod.check_user_engagement(model, user_data, threshold)
-            out["model_accuracy"] = acc
+            if self._engagement_model is None:
+                df = mod.generate_synthetic_engagement_data(num_samples=300)
+                self._engagement_model, self._engagement_acc = mod.train_engagement_model(df)
+            out = mod.check_user_engagement(self._engagement_model, user_data, threshold)
+            out["model_accuracy"] = self._engagement_acc
             return out
         except Exception as e:
             return {"error": "engagement_check_failed", "message": str(e)}
@@ -189,7 +346,7 @@ class CareerMatchOrchestrator:
                     rep = mod.fairness_table(candidate_df, group)
                     # serialize results for JSON
                     reports[group] = {
-                        "reference_group": rep["reference_group"].to_dict(orient="records") if rep.get("reference_group") is not None else None,
+                        "reference_group": rep.get("reference_group"),
                         "rates": rep["rates"].to_dict(orient="records") if rep.get("rates") is not None else None,
                         "calibration": rep["calibration"].to_dict(orient="records") if rep.get("calibration") is not None else None,
                     }
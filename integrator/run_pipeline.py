@@ -1,15 +1,25 @@
 """Simple CLI demo that runs a full pipeline using CareerMatchOrchestrator.
 
 This reads a CV JSON file and a job title then runs scoring, roadmap generation,
-micro-project recommendations and adaptive recommendations, printing the
-combined result.
+micro-project recommendations and adaptive recommendations concurrently,
+printing each stage's result as soon as it completes.
 """
+import asyncio
 import json
+import os
 import sys
 from pathlib import Path
 
 from integrator.orchestrator import CareerMatchOrchestrator
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+# Results of repeated runs with identical inputs are served from this cache
+CACHE_PATH = os.environ.get("CAREERMATCH_CACHE", str(Path.home() / ".cache" / "careermatch" / "results.db"))
+
 
 SAMPLE_CV = {
     "summary": "Data scientist with experience building predictive models and analysis.",
@@ -20,6 +30,54 @@ SAMPLE_CV = {
 }
 
 
+async def stream_pipeline(orchestrator, cv_obj, job_title, resume_text, cv_features):
+    """Run the four independent stages concurrently (each in a worker thread,
+    since the feature modules are synchronous) and yield (stage, result) as
+    each one finishes."""
+    async def stage(name, fn, *args):
+        return name, await asyncio.to_thread(fn, *args)
+
+    stages = [
+        stage("scoring", orchestrator.score_cv, cv_obj, job_title),
+        stage("roadmap", orchestrator.build_roadmap, resume_text, job_title),
+        stage("micro", orchestrator.recommend_micro_projects, cv_obj, job_title),
+        stage("adaptive", orchestrator.adaptive_recommend, cv_features, "data_scientist"),
+    ]
+    for done in asyncio.as_completed(stages):
+        yield await done
+
+
+STAGE_HEADERS = {
+    "scoring": "=== Running scoring ===",
+    "roadmap": "=== Building roadmap (from sample resume text) ===",
+    "micro": "=== Micro project recommendations ===",
+    "adaptive": "=== Adaptive recommendations (skill-tree) ===",
+}
+
+
+def emit(obj) -> None:
+    """Print `obj` as indented JSON; orjson writes UTF-8 bytes straight to stdout."""
+    if orjson is None:
+        print(json.dumps(obj, indent=2, ensure_ascii=False))
+        return
+    sys.stdout.flush()  # keep ordering with preceding print() output
+    sys.stdout.buffer.write(orjson.dumps(
+        obj,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        default=str,
+    ))
+    sys.stdout.buffer.flush()
+
+
+def print_stage(name, result) -> None:
+    print("\n" + STAGE_HEADERS[name])
+    if name == "micro" and isinstance(result, dict) and "recommendations" in result:
+        # show just keys
+        print("Recommended for missing skills:", list(result.get("recommendations", {}).keys()))
+    else:
+        emit(result)
+
+
 def main():
     cv_path = None
     job_title = "Machine Learning Engineer"
@@ -34,30 +92,19 @@ def main():
     else:
         cv_obj = SAMPLE_CV
 
-    orchestrator = CareerMatchOrchestrator()
-
-    print("\n=== Running scoring ===")
-    scoring = orchestrator.score_cv(cv_obj, job_title)
-    print(json.dumps(scoring, indent=2, ensure_ascii=False))
-
-    print("\n=== Building roadmap (from sample resume text) ===")
+    orchestrator = CareerMatchOrchestrator(cache_path=CACHE_PATH)
     sample_text = "Python, pandas, scikit-learn, some exposure to docker."
-    roadmap = orchestrator.build_roadmap(sample_text, job_title)
-    print(json.dumps(roadmap, indent=2, ensure_ascii=False))
-
-    print("\n=== Micro project recommendations ===")
-    micro = orchestrator.recommend_micro_projects(cv_obj, job_title)
-    if isinstance(micro, dict) and "recommendations" in micro:
-        # show just keys
-        print("Recommended for missing skills:", list(micro.get("recommendations", {}).keys()))
-    else:
-        print(json.dumps(micro, indent=2, ensure_ascii=False))
-
-    print("\n=== Adaptive recommendations (skill-tree) ===")
     # building the `cv_features` map expected by adaptive_recommendation_system
     cv_features = {"python": {"years_experience": 1, "num_projects": 1, "has_cert": False}}
-    adaptive = orchestrator.adaptive_recommend(cv_features, "data_scientist")
-    print(json.dumps(adaptive, indent=2, ensure_ascii=False))
+
+    async def run():
+        async for name, result in stream_pipeline(orchestrator, cv_obj, job_title, sample_text, cv_features):
+            print_stage(name, result)
+
+    try:
+        asyncio.run(run())
+    finally:
+        orchestrator.close()
 
 
 if __name__ == "__main__":
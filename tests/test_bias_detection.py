@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from integrator.orchestrator import _load_module
+
+
+@pytest.fixture(scope="module")
+def bias():
+    return _load_module("bias_detection", "bias_detection.py")
+
+
+def test_group_rates_drops_missing_group_labels(bias):
+    group = pd.Series(["female", None, "male", np.nan, "female", "male"])
+    y_pred = pd.Series([True, True, False, False, False, True])
+    y_true = pd.Series([1, 0, 0, 1, 0, 1])
+
+    out = bias.group_rates(y_pred, y_true, group)
+
+    assert out["group"].tolist() == ["female", "male"]
+    assert out["n"].tolist() == [2, 2]
+    assert out["selection_rate"].tolist() == [0.5, 0.5]
+    assert out["tpr"].tolist() == [1.0, 1.0]
+    assert out["fpr"].tolist() == [0.0, 0.0]
+
+
+def test_brier_by_group_rows_are_sorted_like_group_rates(bias):
+    group = pd.Series(["male", "female", "nonbinary", "female", "male"])
+    scores = pd.Series([80.0, 40.0, 55.0, 90.0, 20.0])
+    labels = pd.Series([1, 0, 1, 1, 0])
+
+    cal = bias.brier_by_group(scores, labels, group)
+    rates = bias.group_rates(scores >= 50, labels, group)
+
+    assert cal["group"].tolist() == ["female", "male", "nonbinary"]
+    assert cal["group"].tolist() == rates["group"].tolist()
+
+
+# Reference implementations: the groupby + sklearn versions the vectorised
+# helpers replaced.
+def _group_rates_ref(y_pred, y_true, group):
+    from sklearn.metrics import confusion_matrix
+
+    rows = []
+    for g, idx in group.groupby(group).groups.items():
+        yp = y_pred.loc[idx].astype(int)
+        yt = y_true.loc[idx].astype(int)
+        tn, fp, fn, tp = confusion_matrix(yt, yp, labels=[0, 1]).ravel()
+        rows.append({
+            "group": g,
+            "n": len(idx),
+            "selection_rate": yp.mean(),
+            "tpr": tp / (tp + fn) if tp + fn else np.nan,
+            "fpr": fp / (fp + tn) if fp + tn else np.nan,
+        })
+    return pd.DataFrame(rows).sort_values("group").reset_index(drop=True)
+
+
+def _brier_ref(scores, labels, group):
+    from sklearn.metrics import brier_score_loss
+
+    p = np.clip(scores / 100.0, 1e-6, 1 - 1e-6)
+    rows = [
+        {"group": g, "n": len(idx), "brier": brier_score_loss(labels.loc[idx].astype(int), p.loc[idx])}
+        for g, idx in group.groupby(group).groups.items()
+    ]
+    return pd.DataFrame(rows).sort_values("group").reset_index(drop=True)
+
+
+@pytest.fixture
+def audit_frame():
+    rng = np.random.default_rng(0)
+    n = 300
+    group = rng.choice(["nonbinary", "male", "female"], n).astype(object)
+    group[rng.random(n) < 0.05] = None
+    return pd.DataFrame({
+        "model_score": rng.uniform(0, 100, n),
+        "label": rng.integers(0, 2, n),
+        "gender": group,
+    })
+
+
+def test_group_rates_matches_groupby(bias, audit_frame):
+    y_pred = audit_frame["model_score"] >= 50
+    got = bias.group_rates(y_pred, audit_frame["label"], audit_frame["gender"])
+    pd.testing.assert_frame_equal(
+        got, _group_rates_ref(y_pred, audit_frame["label"], audit_frame["gender"]),
+        check_dtype=False,
+    )
+
+
+def test_brier_by_group_matches_groupby(bias, audit_frame):
+    got = bias.brier_by_group(audit_frame["model_score"], audit_frame["label"], audit_frame["gender"])
+    pd.testing.assert_frame_equal(
+        got, _brier_ref(audit_frame["model_score"], audit_frame["label"], audit_frame["gender"]),
+        check_dtype=False,
+    )
+
+
+def test_fairness_table_reference_group_tie_takes_first_group(bias):
+    # "a" and "c" share the top selection rate; as with idxmax the first row wins
+    df = pd.DataFrame({
+        "model_score": [90.0, 10.0, 10.0, 80.0, 95.0, 5.0],
+        "label": [1, 0, 0, 1, 1, 0],
+        "gender": ["c", "c", "b", "a", "b", "a"],
+    })
+    out = bias.fairness_table(df, "gender")
+    assert out["reference_group"]["reference_group"] == "a"
+    assert out["rates"]["group"].tolist() == out["calibration"]["group"].tolist() == ["a", "b", "c"]
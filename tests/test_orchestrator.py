@@ -1,13 +1,15 @@
-import json
-import sys
-from pathlib import Path
-# make repository root importable for tests
-ROOT = Path(__file__).resolve().parents[1]
-sys.path.insert(0, str(ROOT))
+import pytest
 
 from integrator.orchestrator import CareerMatchOrchestrator
 
 
+@pytest.fixture(scope="module")
+def orch():
+    # one orchestrator for the module; tests only read from it
+    return CareerMatchOrchestrator()
+
+
+@pytest.fixture
 def sample_cv():
     return {
         "summary": "Junior data practitioner. Built small ML pipelines.",
@@ -17,43 +19,56 @@ def sample_cv():
     }
 
 
-def test_score_cv():
-    o = CareerMatchOrchestrator()
-    out = o.score_cv(sample_cv(), "data scientist")
+def test_score_cv(orch, sample_cv):
+    out = orch.score_cv(sample_cv, "data scientist")
     assert isinstance(out, dict)
     assert "scores" in out or "error" in out
 
 
-def test_build_roadmap():
-    o = CareerMatchOrchestrator()
-    r = o.build_roadmap("Python, pandas, SQL", "Data Analyst")
+@pytest.mark.parametrize("batch_size", [1, 2, 4, 8])
+def test_score_cv_batch(orch, sample_cv, batch_size):
+    cvs = []
+    for i in range(batch_size):
+        cv = dict(sample_cv, skills=sample_cv["skills"][: i % 3])
+        if i % 2:
+            cv["experience"] = [{"title": "analyst", "years": i}]
+        cvs.append(cv)
+    batched = orch.score_cv_batch(cvs, "data scientist")
+    singles = [orch.score_cv(cv, "data scientist") for cv in cvs]
+    assert len(batched) == len(singles) == batch_size
+    for b, s in zip(batched, singles):
+        assert b.keys() == s.keys()
+        for key in ("scores", "subscores"):
+            if key in s:
+                assert b[key] == pytest.approx(s[key], abs=1e-6)
+
+
+def test_build_roadmap(orch):
+    r = orch.build_roadmap("Python, pandas, SQL", "Data Analyst")
     assert isinstance(r, dict)
     assert "target_role" in r or "error" in r
 
 
-def test_adaptive_recommend():
-    o = CareerMatchOrchestrator()
+def test_adaptive_recommend(orch):
     cv_features = {"python": {"years_experience": 1, "num_projects": 1, "has_cert": False}}
-    out = o.adaptive_recommend(cv_features, "data_scientist")
+    out = orch.adaptive_recommend(cv_features, "data_scientist")
     assert isinstance(out, dict)
 
 
-def test_assess_engagement():
-    o = CareerMatchOrchestrator()
+def test_assess_engagement(orch):
     user = {
         'time_on_quest': 12,
         'errors_in_session': 2,
         'quest_difficulty': 3,
         'prev_completion_rate': 0.8,
     }
-    out = o.assess_engagement(user)
+    out = orch.assess_engagement(user)
     assert isinstance(out, dict)
     # If dependencies missing, orchestrator returns an error dict
     assert 'prob_dropoff' in out or 'error' in out
 
 
-def test_query_knowledge_graph():
-    o = CareerMatchOrchestrator()
-    res = o.query_knowledge_graph('courses_for_skill', 'Pandas')
+def test_query_knowledge_graph(orch):
+    res = orch.query_knowledge_graph('courses_for_skill', 'Pandas')
     assert isinstance(res, dict)
     assert 'courses' in res or 'error' in res
@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip("streamlit")
+
+from integrator.orchestrator import _load_module
+
+
+@pytest.fixture(scope="module")
+def polish():
+    return _load_module("resume_polish", "resume_polish.py")
+
+
+class FlakyClient:
+    """Raises `exc` for the first `failures` chat calls, then answers."""
+
+    def __init__(self, failures, exc):
+        self.failures, self.exc, self.calls = failures, exc, 0
+
+    def chat(self, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.exc
+        return {"message": {"content": "Polished."}}
+
+
+@pytest.fixture
+def no_sleep(polish, monkeypatch):
+    monkeypatch.setattr(polish, "_RETRY_DELAYS", [0] * len(polish._RETRY_DELAYS))
+
+
+def test_connection_error_is_retried(polish, monkeypatch, no_sleep):
+    client = FlakyClient(2, ConnectionError("server restarting"))
+    monkeypatch.setattr(polish, "_CLIENT", client)
+    assert polish._chat_with_retry(model="m", messages=[])["message"]["content"] == "Polished."
+    assert client.calls == 3
+
+
+def test_retries_stop_after_all_attempts(polish, monkeypatch, no_sleep):
+    client = FlakyClient(100, ConnectionError("server down"))
+    monkeypatch.setattr(polish, "_CLIENT", client)
+    with pytest.raises(ConnectionError):
+        polish._chat_with_retry(model="m", messages=[])
+    assert client.calls == polish.RETRY_ATTEMPTS
+
+
+def test_non_transient_error_is_not_retried(polish, monkeypatch, no_sleep):
+    client = FlakyClient(1, ValueError("bad request"))
+    monkeypatch.setattr(polish, "_CLIENT", client)
+    with pytest.raises(ValueError):
+        polish._chat_with_retry(model="m", messages=[])
+    assert client.calls == 1
+
+
+class FailingEmbedClient:
+    def __init__(self, exc):
+        self.exc = exc
+
+    def embed(self, **kwargs):
+        raise self.exc
+
+
+def test_transient_embed_failure_keeps_semantic_cache(polish, monkeypatch):
+    monkeypatch.setattr(polish, "_sem_enabled", True)
+    monkeypatch.setattr(polish, "_CLIENT", FailingEmbedClient(ConnectionError("server restarting")))
+    assert polish._embed_sync("built a model") is None
+    assert polish._sem_enabled
+
+
+def test_missing_embed_model_disables_semantic_cache(polish, monkeypatch):
+    monkeypatch.setattr(polish, "_sem_enabled", True)
+    monkeypatch.setattr(polish, "_CLIENT", FailingEmbedClient(polish.ollama.ResponseError("model not found", 404)))
+    assert polish._embed_sync("built a model") is None
+    assert not polish._sem_enabled
@@ -0,0 +1,75 @@
+import pytest
+
+from integrator.orchestrator import _load_module
+
+
+@pytest.fixture(scope="module")
+def roadmap():
+    return _load_module("transparent_career_roadmap", "roadmap_generation.py")
+
+
+def _resolve_prereqs_ref(skill, role_req):
+    # the recursive DFS the iterative walk replaced
+    skills_meta = role_req.get("skills", {})
+    visited, order = set(), []
+
+    def dfs(s):
+        if s in visited:
+            return
+        visited.add(s)
+        for p in skills_meta.get(s, {}).get("prereq", []):
+            dfs(p)
+        order.append(s)
+
+    dfs(skill)
+    return [v for v in order if v != skill]
+
+
+# a diamond (D via B and C), siblings whose order must be kept, and a chain
+DIAMOND = {"skills": {
+    "A": {"prereq": ["B", "C"]},
+    "B": {"prereq": ["D"]},
+    "C": {"prereq": ["D", "E"]},
+    "D": {"prereq": ["F"]},
+    "E": {"prereq": []},
+    "G": {"prereq": ["E", "D", "B"]},
+}}
+
+
+def _roles(roadmap):
+    return [DIAMOND] + list(roadmap.KNOWLEDGE_GRAPH.values())
+
+
+def test_resolve_prereqs_matches_recursive_dfs(roadmap):
+    for role_req in _roles(roadmap):
+        for skill in role_req["skills"]:
+            assert roadmap.resolve_prereqs(skill, role_req) == _resolve_prereqs_ref(skill, role_req)
+
+
+def test_resolve_prereqs_shared_memo_matches_recursive_dfs(roadmap):
+    for role_req in _roles(roadmap):
+        memo = {}
+        for skill in reversed(list(role_req["skills"])):
+            assert roadmap.resolve_prereqs(skill, role_req, memo) == _resolve_prereqs_ref(skill, role_req)
+
+
+def test_role_topo_follows_graph_edits(roadmap):
+    role_req = {"skills": {"X": {"prereq": ["Y"]}, "Y": {"prereq": []}}}
+    assert roadmap._precompute_role_topo(role_req)["X"] == ["Y"]
+    role_req["skills"]["Y"]["prereq"] = ["Z"]
+    assert roadmap._precompute_role_topo(role_req)["X"] == ["Z", "Y"]
+    assert "_topo" not in role_req
+
+
+def test_build_roadmap_picks_up_role_edits(roadmap):
+    role = "Data Analyst"
+    meta = roadmap.KNOWLEDGE_GRAPH[role]["skills"]["Visualization"]
+    original = list(meta["prereq"])
+    before = roadmap.build_roadmap_logic("", role)
+    try:
+        meta["prereq"] = ["Storytelling"]
+        after = roadmap.build_roadmap_logic("", role)
+    finally:
+        meta["prereq"] = original
+    assert before.model_dump() != after.model_dump()
+    assert roadmap.build_roadmap_logic("", role).model_dump() == before.model_dump()
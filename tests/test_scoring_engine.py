@@ -0,0 +1,42 @@
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from integrator.orchestrator import _load_module
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return _load_module("explainable_scoring_engine", "scoring_engine.py")
+
+
+def _relevance_ref(cv_text, job_text):
+    # the two-document TfidfVectorizer fit the closed form replaced
+    cv_text, job_text = cv_text.strip(), (job_text or "").strip()
+    if not cv_text or not job_text:
+        return 0.0
+    X = TfidfVectorizer(ngram_range=(1, 2), min_df=1).fit_transform([cv_text, job_text])
+    return float(cosine_similarity(X[0], X[1])[0][0] * 100.0)
+
+
+@pytest.mark.parametrize("cv_text, job_text", [
+    ("Built ML pipelines in Python and pandas.", "Data scientist: Python, pandas, machine learning"),
+    ("python python sql", "python"),
+    ("Docker, Kubernetes", "Data analyst with Excel"),
+    ("Machine learning engineer", "machine learning engineer"),
+    ("", "data scientist"),
+    ("python", "   "),
+    ("!!!", "data"),
+])
+def test_relevance_matches_tfidf_vectorizer(engine, cv_text, job_text):
+    assert engine._relevance_from(cv_text, job_text) == pytest.approx(_relevance_ref(cv_text, job_text), abs=1e-9)
+
+
+def test_relevance_score_matches_tfidf_vectorizer(engine):
+    cv = {
+        "summary": "Junior data practitioner. Built small ML pipelines.",
+        "skills": ["python", "pandas"],
+        "projects": [{"name": "small model", "description": "classification experiment", "tech": ["python"]}],
+    }
+    job = "Data scientist with Python, pandas and classification experience"
+    assert engine.relevance_score(cv, job) == pytest.approx(_relevance_ref(engine.cv_to_text(cv), job), abs=1e-9)